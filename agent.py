@@ -1,26 +1,36 @@
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, List
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate 
 from langchain_core.output_parsers import StrOutputParser
-from googlenewsdecoder import new_decoderv1
-from gnews import GNews
-from newspaper import Article
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 from pydantic.v1 import BaseModel, Field 
+from langchain_core.runnables import RunnableLambda
+from langchain_core.callbacks import BaseCallbackHandler
 import json 
 import re 
 import os 
+import time
+import asyncio
+import contextvars
+import hashlib
+import threading
 import requests 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 
-# --- Selenium 라이브러리 임포트 ---
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# --- 기사 추출 (HTTP 우선, Selenium 폴백) ---
+from fetcher import fetch_article
+from cache import SQLiteTTLCache
+from llm_cache import llm_response_cache, CACHE_HIT_KEY, LLM_CACHE_ENABLED, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+from metrics import (collect_run_metrics, node_timer, record_gnews, record_llm, record_prompt_compression, record_prescreen,
+                     start_metrics_server)
+from compress import compress_draft_inputs, serialize_sources
+from dedup import NearDuplicateFilter
+from claim_index import claim_index, CLAIM_INDEX_ENABLED, CLAIM_TEXT_CHARS
+from prescreen import score_article, domain_of, domain_reputation, CORROBORATED_SCORE, PRESCREEN_ENABLED
+from deadline import run_deadline, node_budget, node_remaining, degrade
+from ratelimit import (gemini_limiter, gnews_limiter, decoder_limiter, RetryableError, is_retryable_message,
+                       langchain_rate_limiter, rate_limited_runnable)
 
 # SSL 인증서 검증 오류 우회를 위한 requests 설정
 requests.packages.urllib3.disable_warnings()
@@ -29,11 +39,166 @@ requests.packages.urllib3.disable_warnings()
 MODEL_NAME = 'gemini-2.5-flash'
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY 환경 변수가 설정되지 않았습니다.")
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Gemini 호출 횟수, 지연 시간, 토큰 사용량을 metrics 모듈에 기록합니다.
 
-llm = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.0, api_key=GEMINI_API_KEY)
-llm_json = ChatGoogleGenerativeAI(model=MODEL_NAME, temperature=0.0, response_mime_type="application/json", api_key=GEMINI_API_KEY) 
+    LLM 응답 캐시에서 꺼낸 응답은 호출로 세지 않습니다 (캐시 적중은 llm_cache 테이블 조회 시 기록됨).
+    """
+
+    def __init__(self):
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        generations = [generation for batch in response.generations for generation in batch]
+        if generations and all((generation.generation_info or {}).get(CACHE_HIT_KEY) for generation in generations):
+            return
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, 'message', None)
+                for key, value in (getattr(message, 'usage_metadata', None) or {}).items():
+                    if isinstance(value, int):
+                        usage[key] = usage.get(key, 0) + value
+        record_llm(time.perf_counter() - started if started else 0.0, usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+
+llm_metrics_callback = LLMMetricsCallback()
+
+# Gemini 클라이언트는 첫 LLM 호출 시점에 한 번만 생성 (임포트 시간 단축)
+_llm_clients = {}
+_llm_lock = threading.Lock()
+
+
+def _request_timeout(kwargs):
+    """남은 노드 예산을 Gemini 요청 제한 시간(timeout)으로 넣은 kwargs. 예산이 이미 끝났으면 요청하지 않음."""
+    remaining = node_remaining()
+    if remaining is None:
+        return kwargs
+    if remaining <= 0:
+        raise TimeoutError("노드 예산 소진")
+    return {**kwargs, 'timeout': remaining}
+
+
+def _budgeted_chat_model(**kwargs):
+    """요청마다 남은 노드 예산을 제한 시간으로 넘기는 Gemini 채팅 모델.
+
+    _generate/_stream 단계에서 넣으므로 LLM 응답 캐시 키(호출 인자)에는 포함되지 않습니다.
+    stream_graph처럼 스트리밍 콜백이 붙으면 LangChain이 _generate 대신 _stream을 부르므로 둘 다 감쌉니다.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    class BudgetedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **_request_timeout(kwargs))
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **_request_timeout(kwargs))
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            yield from super()._stream(messages, stop=stop, run_manager=run_manager, **_request_timeout(kwargs))
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **_request_timeout(kwargs)):
+                yield chunk
+
+    return BudgetedChatGoogleGenerativeAI(**kwargs)
+
+
+def _get_llm_client(name, **kwargs):
+    with _llm_lock:
+        if name not in _llm_clients:
+            if not GEMINI_API_KEY:
+                raise ValueError("GEMINI_API_KEY 환경 변수가 설정되지 않았습니다.")
+            # temperature=0.0이므로 같은 프롬프트의 응답은 디스크 캐시(llm_cache.py)에서 재사용
+            # 호출 속도 제한과 재시도는 ratelimit.py가 맡으므로 클라이언트 자체 재시도는 끔
+            llm = _budgeted_chat_model(model=MODEL_NAME, temperature=0.0, api_key=GEMINI_API_KEY, cache=llm_response_cache, callbacks=[llm_metrics_callback],
+                                         rate_limiter=langchain_rate_limiter(gemini_limiter), max_retries=1, **kwargs)
+            _llm_clients[name] = rate_limited_runnable(llm, gemini_limiter)
+        return _llm_clients[name]
+
+
+def get_llm():
+    return _get_llm_client('text')
+
+
+def get_llm_json():
+    return _get_llm_client('json', response_mime_type="application/json")
+
+# --- 비동기 실행 설정 ---
+# 비동기 경로(arun_graph)에서 브라우저/GNews 같은 블로킹 작업을 돌리는 공용 스레드 풀
+BLOCKING_EXECUTOR_WORKERS = int(os.environ.get("BLOCKING_EXECUTOR_WORKERS", "8"))
+_blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix="blocking")
+
+
+async def _run_blocking(func, *args):
+    """블로킹 함수를 공용 스레드 풀에서 실행하고 결과를 기다립니다."""
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_blocking_executor, ctx.run, func, *args)
+
+
+# --- 노드 예산 (deadline.py) ---
+def _budget_exhausted():
+    remaining = node_remaining()
+    return remaining is not None and remaining <= 0
+
+
+def _within_budget(func, *args):
+    """func를 현재 노드의 남은 예산 안에서 실행합니다. 넘기면 TimeoutError (마감 시간이 없으면 그대로 실행).
+
+    실행 중인 호출은 취소할 수 없으므로 다른 스레드에 맡기고 버리지 않고, 같은 스레드에서 실행하되
+    Gemini 요청마다 남은 예산을 제한 시간으로 넘겨(_request_timeout) 예산 안에 끝나게 합니다.
+    """
+    remaining = node_remaining()
+    if remaining is None:
+        return func(*args)
+    if remaining <= 0:
+        raise TimeoutError("노드 예산 소진")
+    try:
+        return func(*args)
+    except Exception as e:
+        # 요청 제한 시간 초과 등으로 실패했고 예산도 끝났으면 예산 초과로 처리
+        if _budget_exhausted():
+            raise TimeoutError(f"노드 예산({remaining:.1f}s) 초과") from e
+        raise
+
+
+async def _awithin_budget(awaitable):
+    remaining = node_remaining()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"노드 예산({remaining:.1f}s) 초과")
+
+# --- 뉴스 검색 설정 ---
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "3"))
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", "3"))
+SEARCH_HIT_TIMEOUT = float(os.environ.get("SEARCH_HIT_TIMEOUT", "40"))
+SUMMARY_MIN_LENGTH = 50
+# 유사 중복 기사를 걸러낸 뒤에도 결과 수를 채울 수 있도록 GNews에 더 요청할 배수
+SEARCH_OVERFETCH_FACTOR = int(os.environ.get("SEARCH_OVERFETCH_FACTOR", "2"))
+SUMMARY_FAILED_MESSAGE = "기사 요약 중 오류가 발생하여 요약 불가."
+# 예산이 부족해 요약을 생략할 때 대신 쓰는 본문 앞부분 길이
+SUMMARY_FALLBACK_CHARS = 200
+
+# Google News 링크 → 언론사 원문 URL 디코딩 캐시 (실패한 디코딩은 짧게 보관)
+DECODE_CACHE_TTL = float(os.environ.get("DECODE_CACHE_TTL", str(30 * 24 * 60 * 60)))
+DECODE_NEGATIVE_TTL = float(os.environ.get("DECODE_NEGATIVE_TTL", str(60 * 60)))
+decode_cache = SQLiteTTLCache('decode_cache', ttl=DECODE_CACHE_TTL, max_entries=int(os.environ.get("DECODE_CACHE_MAX_ENTRIES", "50000")))
+
+# 여러 검색에 반복해서 등장하는 기사는 본문 기준으로 한 번만 요약
+article_summary_cache = SQLiteTTLCache('article_summary_cache', ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
 
 # --- Pydantic 스키마 정의 ---
 class EvaluationVerdict(BaseModel):
@@ -46,6 +211,25 @@ class EvaluationVerdict(BaseModel):
     overall_fake_probability: float = Field(..., description="전체 허위 가능성 점수 (0.0=진실, 1.0=거짓)")
     final_judgment: str = Field(..., description="점수를 종합한 최종 판단 요약 문장")
 
+class FactCheckVerdict(EvaluationVerdict):
+    fact_check: str = Field(..., description="원본 기사와 검색 결과를 비교한 상세 팩트체크 서술 (최종 결론 포함)")
+
+
+class ArticleSummary(BaseModel):
+    index: int = Field(..., description="입력된 기사 번호 (0부터 시작)")
+    summary: str = Field(..., description="기사의 핵심을 3문장 이내로 간결하게 요약한 내용")
+
+
+class ArticleSummaryBatch(BaseModel):
+    summaries: List[ArticleSummary] = Field(..., description="입력된 모든 기사에 대한 요약 목록 (기사당 1개)")
+
+
+def _strip_json_fence(json_string):
+    json_string = json_string.strip()
+    if json_string.startswith("```json"):
+        json_string = json_string[7:-3].strip()
+    return json_string
+
 
 # --- State 정의 ---
 class NewsState(TypedDict):
@@ -53,6 +237,7 @@ class NewsState(TypedDict):
     input: str
     article_title: str
     article_text: str 
+    article_fetch_tier: str
     article_result: List[dict]
     search_queries: List[str]
     keyword_summary: str
@@ -60,10 +245,19 @@ class NewsState(TypedDict):
     fact_check: str
     verdict: EvaluationVerdict 
     reference: str 
+    cache_hit: bool
+    cached_at: float
+    use_claim_index: bool
+    claim_match: dict
+    use_prescreen: bool
+    prescreen: dict
+    degraded: bool
+    degraded_reasons: List[str]
+    metrics: dict
 
 # --- 0. URL에서 기사 본문 추출 (⭐ 네이트 뉴스(#article_body) 추가) ---
 def extract_article_text(state: NewsState):
-    print("\n[Node 0: extract_article_text] 🕵️ 기사 본문 추출 시도 (Selenium)...")
+    print("\n[Node 0: extract_article_text] 🕵️ 기사 본문 추출 시도 (HTTP 우선, Selenium 폴백)...")
     if state['input_type'] == 'text':
         print("...오류: URL만 입력해야 합니다. 텍스트 입력을 차단합니다.")
         state['article_text'] = ""
@@ -73,79 +267,156 @@ def extract_article_text(state: NewsState):
 
     url = state['input']
     
-    chrome_options = Options()
-    chrome_options.add_argument("--headless") 
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
-    
-    driver = None 
     try:
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-        driver.delete_all_cookies()
-        driver.get(url)
-        
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "meta[property='og:title']"))
-        )
-        title = driver.find_element(By.CSS_SELECTOR, "meta[property='og:title']").get_attribute('content')
-
-        # ⭐ 본문 추출 (네이버, 다음, 네이트 순으로 시도)
-        extracted_text = ""
-        try:
-            main_content = driver.find_element(By.CSS_SELECTOR, "#articleBodyContents")
-            extracted_text = main_content.text
-            print("...네이버 뉴스 본문(#articleBodyContents) 텍스트 직접 추출 성공.")
-        except Exception:
-            try:
-                main_content = driver.find_element(By.CSS_SELECTOR, "#dic_area")
-                extracted_text = main_content.text
-                print("...다음 뉴스 본문(#dic_area) 텍스트 직접 추출 성공.")
-            except Exception:
-                try:
-                    # ⭐ 네이트 뉴스 본문 컨테이너 추가
-                    main_content = driver.find_element(By.CSS_SELECTOR, "#article_body") 
-                    extracted_text = main_content.text
-                    print("...네이트 뉴스 본문(#article_body) 텍스트 직접 추출 성공.")
-                except Exception:
-                    # 위 세 방식이 모두 실패하면 Newspaper3k로 최후의 시도
-                    print("...특정 컨테이너를 찾지 못해 Newspaper3k로 파싱 시도.")
-                    html = driver.page_source
-                    article = Article(url)
-                    article.set_html(html) 
-                    article.parse()
-                    extracted_text = article.text
+        fetched = fetch_article(url, min_length=30, timeout=node_remaining())
+        title = fetched['title']
+        extracted_text = fetched['text']
+        print(f"...본문 컨테이너({fetched['container']}) 추출 성공. [{fetched['tier']}, {fetched['elapsed']:.2f}s]")
 
         if len(extracted_text) < 30: 
             raise ValueError("추출된 기사 본문의 길이가 너무 짧거나 내용이 부실합니다.")
             
         state['article_title'] = title
         state['article_text'] = extracted_text 
+        state['article_fetch_tier'] = fetched['tier']
         print(f"...본문 추출 성공. (제목: {title})")
         
     except Exception as e:
         print(f"URL에서 기사 본문 추출 에러 발생: {e}")
+        if _budget_exhausted():
+            degrade("기사 본문 추출 시간 초과")
         state['article_title'] = ""
         state['article_text'] = "" 
         state['keyword_summary'] = "추출된_기사_없음"
         state['fact_check'] = "URL에서 기사 본문 추출에 실패했거나 내용이 부실합니다. 팩트체크를 진행할 수 없습니다."
-    
-    finally:
-        if driver:
-            driver.quit() 
             
     return state
 
 
+async def aextract_article_text(state: NewsState):
+    return await _run_blocking(extract_article_text, state)
+
+
+# --- 0-0. 저비용 사전 선별 (prescreen.py) ---
+def _corroboration(state: NewsState):
+    """같은 주장을 사실로 판정받은 다른 언론사 수 (과거 판정 인덱스 기준)."""
+    if not CLAIM_INDEX_ENABLED:
+        return 0
+    own_domain = domain_of(state['input'])
+    matches = claim_index.search(
+        state['article_title'], text=state['article_text'], top_k=5,
+        min_score=CLAIM_SEED_THRESHOLD, exclude_key=canonicalize_url(state['input']),
+    )
+    return len({domain_of(key) for _, key, record in matches
+                if record['verdict']['overall_fake_probability'] < CORROBORATED_SCORE and domain_of(key) != own_domain})
+
+
+def _provisional_verdict(result: dict):
+    features = result['features']
+    probability = result['fake_probability']
+    conclusion = "거짓일 가능성이 높습니다" if probability >= 0.5 else "사실일 가능성이 높습니다"
+    return EvaluationVerdict(
+        exaggeration_score=features['sensational_title'],
+        exaggeration_reasoning=f"제목의 선정적 표현 점수 {features['sensational_title']:.2f}, 문장 부호 과용 점수 {features['title_punctuation']:.2f}.",
+        lack_of_sources_score=features['missing_attribution'],
+        lack_of_sources_reasoning=f"본문의 출처 표기 부족 점수 {features['missing_attribution']:.2f}, 익명/전언 표현 점수 {features['hedging']:.2f}.",
+        logical_errors_score=0.5,
+        logical_errors_reasoning="사전 선별 단계에서는 논리 구조를 분석하지 않아 0.5로 설정합니다.",
+        overall_fake_probability=probability,
+        final_judgment=f"[잠정 판정] 도메인 평판({features['reputation']:+.2f})과 기사 표현 특징만으로 {conclusion} "
+                       f"(확신도 {result['confidence']:.0%}). 뉴스 검색을 통한 교차 검증은 거치지 않았습니다.",
+    )
+
+
+def prescreen_article(state: NewsState):
+    print("\n[Node 0-0: prescreen_article] 🚦 도메인 평판/어휘 특징으로 사전 선별...")
+    if not state.get('use_prescreen') or not state['article_text']:
+        return state
+
+    result = score_article(state['input'], state['article_title'], state['article_text'], _corroboration(state))
+    record_prescreen(result)
+    print(f"...사전 선별 점수 {result['fake_probability']:.2f} (확신도 {result['confidence']:.2f}). "
+          f"{'잠정 판정으로 종료합니다.' if result['routed'] else '전체 검증을 진행합니다.'}")
+    state['prescreen'] = result
+    if result['routed']:
+        state['verdict'] = _provisional_verdict(result)
+        state['fact_check'] = state['verdict'].final_judgment
+    return state
+
+
+async def aprescreen_article(state: NewsState):
+    return await _run_blocking(prescreen_article, state)
+
+
+def route_on_prescreen(state: NewsState):
+    return 'provisional' if state['prescreen'].get('routed') else 'continue'
+
+
+# --- 0-1. 과거 판정 중 같은 주장 찾기 (claim_index.py) ---
+# CLAIM_SEED_THRESHOLD 이상이면 과거 근거로 초안부터 다시 작성
+CLAIM_SEED_THRESHOLD = float(os.environ.get("CLAIM_SEED_THRESHOLD", "0.55"))
+# 과거 판정을 그대로 반환하는 모드 (기본 끔): CLAIM_MATCH_THRESHOLD 이상이고 판정이 CLAIM_REUSE_MAX_AGE초 이내일 때만
+CLAIM_REUSE_VERDICT = os.environ.get("CLAIM_REUSE_VERDICT", "0") == "1"
+CLAIM_MATCH_THRESHOLD = float(os.environ.get("CLAIM_MATCH_THRESHOLD", "0.85"))
+CLAIM_REUSE_MAX_AGE = float(os.environ.get("CLAIM_REUSE_MAX_AGE", str(6 * 60 * 60)))
+
+
+def match_claim(state: NewsState):
+    print("\n[Node 0-1: match_claim] 🗂️ 과거 판정 중 같은 주장 검색...")
+    if not (CLAIM_INDEX_ENABLED and state.get('use_claim_index')) or not state['article_text']:
+        return state
+
+    matches = claim_index.search(
+        state['article_title'], text=state['article_text'], top_k=1,
+        min_score=CLAIM_SEED_THRESHOLD, exclude_key=canonicalize_url(state['input']),
+    )
+    if not matches:
+        print("...유사한 과거 판정 없음.")
+        return state
+
+    score, key, record = matches[0]
+    age = time.time() - record.get('indexed_at', 0.0)
+    returned = CLAIM_REUSE_VERDICT and score >= CLAIM_MATCH_THRESHOLD and age <= CLAIM_REUSE_MAX_AGE
+    print(f"...유사한 과거 판정 발견 (유사도 {score:.2f}, {key}). {'판정을 재사용합니다.' if returned else '과거 근거로 초안을 작성합니다.'}")
+    state['claim_match'] = {'url': key, 'title': record['title'], 'score': score, 'age': age,
+                            'mode': 'returned' if returned else 'seeded'}
+    state['search_queries'] = list(record['search_queries'])
+    state['keyword_summary'] = record['search_queries'][-1] if record['search_queries'] else ""
+    # 예전에 저장된 레코드의 부가 필드가 프롬프트에 섞이지 않도록 근거 필드만 사용
+    state['article_result'] = [_evidence(article) for article in record['article_result']]
+    if returned:
+        state['fact_check'] = record['fact_check']
+        state['verdict'] = EvaluationVerdict(**record['verdict'])
+    return state
+
+
+async def amatch_claim(state: NewsState):
+    return await _run_blocking(match_claim, state)
+
+
+def route_on_claim_match(state: NewsState):
+    return state['claim_match'].get('mode', 'no_match')
+
+
+def _index_claim(cache_key: str, state: NewsState):
+    """새 판정을 유사도 인덱스와 도메인 판정 이력에 추가합니다 (과거 판정을 그대로 쓴 결과와 잠정 판정은 제외)."""
+    if state.get('claim_match', {}).get('mode') == 'returned' or state.get('prescreen', {}).get('routed'):
+        return
+    domain_reputation.record_verdict(domain_of(cache_key), state['verdict'].overall_fake_probability)
+    if not CLAIM_INDEX_ENABLED:
+        return
+    claim_index.add(cache_key, {
+        'title': state['article_title'],
+        'text': state['article_text'][:CLAIM_TEXT_CHARS],
+        'search_queries': state['search_queries'],
+        'article_result': state['article_result'],
+        'fact_check': state['fact_check'],
+        'verdict': state['verdict'].dict(),
+    })
+
+
 # --- 1. 초기 키워드 추출 ---
-def extract_initial_keyword(state: NewsState):
-    print("\n[Node 1: extract_initial_keyword] 🧠 Gemini API로 초기 키워드 추출 중...")
-    title = state['article_title']
-    if not title or title == "" or state['keyword_summary'] == "추출된_기사_없음":
-        print("...제목이 없어 키워드 추출을 건너뜁니다.")
-        return state 
-        
-    prompt = ChatPromptTemplate([('system', '당신은 외부 지식을 전혀 사용하지 않고, 오직 입력된 텍스트 "그대로" 키워드를 추출하는 기계적인 분석가입니다. 환각은 엄격히 금지됩니다.'),
+INITIAL_KEYWORD_PROMPT = ChatPromptTemplate([('system', '당신은 외부 지식을 전혀 사용하지 않고, 오직 입력된 텍스트 "그대로" 키워드를 추출하는 기계적인 분석가입니다. 환각은 엄격히 금지됩니다.'),
     ('human', '''
         주어진 "기사 제목:"에서 **핵심 인물, 사건, 장소**를 중심으로 검색 키워드를 2~3개 추출하세요.
 
@@ -157,123 +428,442 @@ def extract_initial_keyword(state: NewsState):
         기사 제목: {title}
     ''')])
 
-    chain = prompt | llm | StrOutputParser()
-    raw_query = chain.invoke({'title': title}).strip()
-    
-    initial_query = " ".join(raw_query.split()) 
+
+def _skip_initial_keyword(state: NewsState):
+    print("\n[Node 1: extract_initial_keyword] 🧠 Gemini API로 초기 키워드 추출 중...")
+    title = state['article_title']
+    if not title or title == "" or state['keyword_summary'] == "추출된_기사_없음":
+        print("...제목이 없어 키워드 추출을 건너뜁니다.")
+        return True
+    return False
+
+
+def _apply_initial_keyword(state: NewsState, raw_query: str):
+    initial_query = " ".join(raw_query.strip().split()) 
     
     state['keyword_summary'] = initial_query
     state['search_queries'] = [initial_query]
     print(f"...추출된 키워드: {initial_query}")
     return state
 
+
+def extract_initial_keyword(state: NewsState):
+    if _skip_initial_keyword(state):
+        return state 
+    chain = INITIAL_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+    title = state['article_title']
+    return _apply_initial_keyword(state, _query_within_budget(chain, {'title': title}, _title_query(title)))
+
+
+async def aextract_initial_keyword(state: NewsState):
+    if _skip_initial_keyword(state):
+        return state 
+    chain = INITIAL_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+    title = state['article_title']
+    return _apply_initial_keyword(state, await _aquery_within_budget(chain, {'title': title}, _title_query(title)))
+
+# 검색 결과 요약 프롬프트 (호출마다 다시 만들지 않도록 모듈 수준에서 생성)
+ARTICLE_SUMMARY_PROMPT = ChatPromptTemplate([
+    ('system', '다음 기사를 3문장 이내로 핵심만 간결하게 요약하세요.'),
+    ('human', '기사: {text}')
+])
+
+_summary_schema_str = ArticleSummaryBatch.schema_json(indent=2).replace('{', '{{').replace('}', '}}')
+MULTI_SUMMARY_PROMPT = ChatPromptTemplate([
+    ('system', f'''다음 {{count}}개의 기사를 각각 3문장 이내로 핵심만 간결하게 요약하세요. **반드시** 아래 스키마를 따르는 JSON으로만 출력하세요.
+
+    스키마:
+    {_summary_schema_str}
+    '''),
+    ('human', '''
+        각 기사는 "[기사 번호]"로 구분되어 있습니다. 모든 기사에 대해 번호(index)와 요약(summary)을 하나씩 작성하세요.
+        기사끼리 내용을 섞지 말고, 각 요약은 해당 기사 본문만을 근거로 작성하세요.
+
+        {articles}
+    ''')
+])
+
 # --- 2. 뉴스 검색 및 요약 공통 로직 (⭐ 네이트 뉴스(#article_body) 추가) ---
-def _search_and_summarize(state: NewsState):
-    query = state['keyword_summary']
-    if query == "추출된_기사_없음":
-        return state
-        
-    def decode_url(url):
-        interval_time = 5 
-        try:
-            decoded_url = new_decoderv1(url, interval=interval_time)
-            return decoded_url["decoded_url"] if decoded_url.get("status") else None
-        except Exception as e:
-            print(f"URL 디코딩 중 에러 발생: {e}") 
-            return None
+def decode_url(url):
+    # 같은 GNews 링크는 캐시된 결과(실패 포함)를 사용하고, 느린 디코더 호출을 건너뜀
+    entry = decode_cache.get_entry(url)
+    if entry is not None:
+        return entry[0]['decoded_url']
 
-    print(f"...GNews API로 '{query}' 검색 중...")
-    google_news = GNews(language='ko', country='KR', max_results=3) 
-    search_query = query.replace('+', ' ') 
-    resp = google_news.get_news(search_query)
+    from googlenewsdecoder import new_decoderv1
 
-    chrome_options = Options()
-    chrome_options.add_argument("--headless") 
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
-    
-    driver = None
+    def decode():
+        # 디코더는 실패해도 예외 대신 status=False를 돌려주므로, 일시적 실패는 예외로 바꿔 재시도
+        result = new_decoderv1(url)
+        if not result.get("status") and is_retryable_message(result.get("message", "")):
+            raise RetryableError(result.get("message", ""))
+        return result
+
+    # 고정 대기(interval) 대신 공용 속도 제한기(decoder_limiter)로 호출 간격을 조절
     try:
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
+        decoded_url = decoder_limiter.call(decode)
+        decoded_url = decoded_url["decoded_url"] if decoded_url.get("status") else None
+    except RetryableError as e:
+        # 재시도를 모두 소진한 일시적 실패는 캐시하지 않음
+        print(f"URL 디코딩 중 에러 발생 (재시도 소진): {e}")
+        return None
     except Exception as e:
-        print(f"🚨 크롬 드라이버 로드 실패: {e}")
-        return state 
+        print(f"URL 디코딩 중 에러 발생: {e}") 
+        decoded_url = None
 
-    article_list = []
-    for item in resp:
-        try:
-            url = decode_url(item['url'])
-            if not url: continue
+    decode_cache.set(url, {'decoded_url': decoded_url}, ttl=None if decoded_url else DECODE_NEGATIVE_TTL)
+    return decoded_url
 
-            driver.delete_all_cookies()
-            driver.get(url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "meta[property='og:title']"))
-            )
-            title = driver.find_element(By.CSS_SELECTOR, "meta[property='og:title']").get_attribute('content')
-            
-            # ⭐ 검색된 기사들도 동일하게 본문 영역 직접 지정
-            extracted_text = ""
-            try:
-                main_content = driver.find_element(By.CSS_SELECTOR, "#articleBodyContents")
-                extracted_text = main_content.text
-            except Exception:
+
+def _fetch_search_hit(item):
+    """검색 결과 1건을 디코딩하고 본문을 추출합니다. 실패 시 None."""
+    url = decode_url(item['url'])
+    if not url:
+        return None
+
+    # 요약 기준(50자 초과)을 만족하지 못할 때만 Selenium으로 넘어감
+    fetched = fetch_article(url, min_length=SUMMARY_MIN_LENGTH + 1, timeout=node_remaining())
+    return {
+        'title': fetched['title'],
+        'text': fetched['text'],
+        'source_url': url,
+        'fetch_tier': fetched['tier']
+    }
+
+
+def _collect_summaries(outputs):
+    summaries = []
+    for output in outputs:
+        if isinstance(output, Exception):
+            print(f'개별 기사 요약 중 에러 발생: {output}')
+            summaries.append(SUMMARY_FAILED_MESSAGE)
+        else:
+            summaries.append(output.strip())
+    return summaries
+
+
+def _summarize_one_by_one(texts):
+    """기사별 요약 호출 (배치 요약 실패 시 폴백)."""
+    summary_chain = ARTICLE_SUMMARY_PROMPT | get_llm() | StrOutputParser()
+    return _collect_summaries(summary_chain.batch([{'text': text} for text in texts], return_exceptions=True))
+
+
+async def _asummarize_one_by_one(texts):
+    summary_chain = ARTICLE_SUMMARY_PROMPT | get_llm() | StrOutputParser()
+    return _collect_summaries(await summary_chain.abatch([{'text': text} for text in texts], return_exceptions=True))
+
+
+def _lookup_cached_summaries(texts):
+    """(캐시 키 목록, 캐시된 요약 또는 None 목록, 새로 요약할 인덱스)를 반환합니다."""
+    keys = [f"{MODEL_NAME}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}" for text in texts]
+    summaries = [article_summary_cache.get(key) if LLM_CACHE_ENABLED else None for key in keys]
+    missing = [idx for idx, summary in enumerate(summaries) if summary is None]
+    if LLM_CACHE_ENABLED and missing:
+        print(f"...기사 요약 캐시: {len(texts) - len(missing)}건 적중, {len(missing)}건 새로 요약.")
+    return keys, summaries, missing
+
+
+def _merge_fresh_summaries(keys, summaries, missing, fresh):
+    for idx, summary in zip(missing, fresh):
+        summaries[idx] = summary
+        if LLM_CACHE_ENABLED and summary != SUMMARY_FAILED_MESSAGE:
+            article_summary_cache.set(keys[idx], summary)
+    return summaries
+
+
+def _report_cached_summaries(summaries, on_cached):
+    if on_cached is not None:
+        for idx, summary in enumerate(summaries):
+            if summary is not None:
+                on_cached(idx, summary)
+
+
+def summarize_articles(texts, on_cached=None):
+    """기사 본문 목록을 요약합니다. 입력 순서대로 요약 리스트를 반환합니다.
+
+    이미 요약한 적 있는 본문은 캐시에서 가져오고(on_cached(인덱스, 요약)로 바로 알림), 나머지만 모아 요약합니다.
+    """
+    keys, summaries, missing = _lookup_cached_summaries(texts)
+    _report_cached_summaries(summaries, on_cached)
+    if not missing:
+        return summaries
+    fresh = _summarize_uncached([texts[idx] for idx in missing])
+    return _merge_fresh_summaries(keys, summaries, missing, fresh)
+
+
+async def asummarize_articles(texts, on_cached=None):
+    keys, summaries, missing = _lookup_cached_summaries(texts)
+    _report_cached_summaries(summaries, on_cached)
+    if not missing:
+        return summaries
+    fresh = await _asummarize_uncached([texts[idx] for idx in missing])
+    return _merge_fresh_summaries(keys, summaries, missing, fresh)
+
+
+def _lead_summaries(texts):
+    return [text[:SUMMARY_FALLBACK_CHARS] + ("…" if len(text) > SUMMARY_FALLBACK_CHARS else "") for text in texts]
+
+
+def _fill_timed_out_summaries(texts, summaries):
+    """요청 제한 시간(남은 예산)에 걸려 실패한 요약은 본문 앞부분으로 대체합니다."""
+    if not _budget_exhausted() or SUMMARY_FAILED_MESSAGE not in summaries:
+        return summaries
+    degrade("기사 요약 시간 초과 (본문 앞부분으로 대체)")
+    leads = _lead_summaries(texts)
+    return [lead if summary == SUMMARY_FAILED_MESSAGE else summary for summary, lead in zip(summaries, leads)]
+
+
+def _summarize_within_budget(texts, on_cached=None):
+    """남은 예산 안에 요약하지 못하면 본문 앞부분을 요약 대신 사용합니다."""
+    if not texts:
+        return []
+    try:
+        return _fill_timed_out_summaries(texts, _within_budget(summarize_articles, texts, on_cached))
+    except TimeoutError:
+        degrade("기사 요약 시간 초과 (본문 앞부분으로 대체)")
+        return _lead_summaries(texts)
+
+
+async def _asummarize_within_budget(texts, on_cached=None):
+    if not texts:
+        return []
+    try:
+        return _fill_timed_out_summaries(texts, await _awithin_budget(asummarize_articles(texts, on_cached)))
+    except TimeoutError:
+        degrade("기사 요약 시간 초과 (본문 앞부분으로 대체)")
+        return _lead_summaries(texts)
+
+
+def _multi_summary_inputs(texts):
+    articles = "\n\n".join(f"[기사 {idx}]\n{text}" for idx, text in enumerate(texts))
+    return {'count': len(texts), 'articles': articles}
+
+
+def _parse_multi_summary(json_string, count):
+    batch = ArticleSummaryBatch(**json.loads(_strip_json_fence(json_string)))
+    by_index = {item.index: item.summary.strip() for item in batch.summaries}
+    if sorted(by_index) != list(range(count)):
+        raise ValueError(f"요약 개수 불일치 (기대 {count}개, 응답 {len(by_index)}개)")
+    print(f"...{count}개 기사 일괄 요약 완료 (LLM 1회 호출).")
+    return [by_index[idx] for idx in range(count)]
+
+
+def _summarize_uncached(texts):
+    """여러 기사 본문을 한 번의 Gemini 호출로 요약합니다."""
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return _summarize_one_by_one(texts)
+
+    try:
+        chain = MULTI_SUMMARY_PROMPT | get_llm_json() | StrOutputParser()
+        return _parse_multi_summary(chain.invoke(_multi_summary_inputs(texts)), len(texts))
+    except Exception as e:
+        print(f"...일괄 요약 실패, 기사별 요약으로 전환: {e}")
+        return _summarize_one_by_one(texts)
+
+
+async def _asummarize_uncached(texts):
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return await _asummarize_one_by_one(texts)
+
+    try:
+        chain = MULTI_SUMMARY_PROMPT | get_llm_json() | StrOutputParser()
+        return _parse_multi_summary(await chain.ainvoke(_multi_summary_inputs(texts)), len(texts))
+    except Exception as e:
+        print(f"...일괄 요약 실패, 기사별 요약으로 전환: {e}")
+        return await _asummarize_one_by_one(texts)
+
+
+def _run_hits_concurrently(items, worker, concurrency=SEARCH_CONCURRENCY, hit_timeout=SEARCH_HIT_TIMEOUT,
+                           on_result=None):
+    """검색 결과를 동시에 처리하되, 결과는 입력(GNews 랭킹) 순서대로 반환합니다.
+
+    각 건은 실행이 시작된 시점부터 hit_timeout초가 지나면 결과를 기다리지 않고 버리고,
+    노드 예산이 끝나면 아직 처리 중인 건을 모두 버립니다. on_result(인덱스, 결과)는 건마다
+    끝나는 즉시 호출한 스레드에서 불립니다.
+    """
+    results = [None] * len(items)
+    started = {}
+
+    def run(idx, item):
+        started[idx] = time.monotonic()
+        return worker(item)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    # 실행 지표(contextvar)가 워커 스레드에서도 보이도록 작업마다 컨텍스트를 복사
+    futures = {
+        executor.submit(contextvars.copy_context().run, run, idx, item): idx
+        for idx, item in enumerate(items)
+    }
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
                 try:
-                    main_content = driver.find_element(By.CSS_SELECTOR, "#dic_area")
-                    extracted_text = main_content.text
-                except Exception:
-                    try:
-                        # ⭐ 네이트 뉴스 본문 컨테이너 추가
-                        main_content = driver.find_element(By.CSS_SELECTOR, "#article_body")
-                        extracted_text = main_content.text
-                    except Exception:
-                        print(f"    - [{url}] 특정 컨테이너 찾기 실패. Newspaper3k 폴백 사용.")
-                        html = driver.page_source
-                        article = Article(url)
-                        article.set_html(html)
-                        article.parse()
-                        extracted_text = article.text
-            
-            if len(extracted_text) > 50:
-                print(f"...'{title}' 기사 요약 중...")
-                article_summary_prompt = ChatPromptTemplate([
-                    ('system', '다음 기사를 3문장 이내로 핵심만 간결하게 요약하세요.'),
-                    ('human', '기사: {text}')
-                ])
-                summary_chain = article_summary_prompt | llm | StrOutputParser()
-                summary = summary_chain.invoke({'text': extracted_text})
-            else:
-                summary = "기사 본문 추출 실패 또는 내용 부족으로 요약 불가."
-
-            article_list.append({
-                'title': title, 
-                'summary': summary.strip(),
-                'source_url': url
-            })
-        except Exception as e:
-            print(f'개별 기사 처리 중 에러 발생: {e}')
-    
-    if driver:
-        driver.quit() 
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f'개별 기사 처리 중 에러 발생: {e}')
+                    continue
+                if on_result is not None and results[futures[future]] is not None:
+                    on_result(futures[future], results[futures[future]])
+            now = time.monotonic()
+            for future in list(pending):
+                idx = futures[future]
+                if idx in started and now - started[idx] > hit_timeout:
+                    print(f"...{idx + 1}번째 검색 결과 처리 시간 초과({hit_timeout}s). 건너뜁니다.")
+                    pending.discard(future)
+            if pending and _budget_exhausted():
+                degrade(f"처리 중이던 검색 결과 {len(pending)}건 제외")
+                pending = set()
+    finally:
+        # 시간 초과로 버린 작업은 백그라운드에서 마저 끝나도록 두고 기다리지 않음
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _collect_search_hits(query, original_text=""):
+    """GNews 검색 후 결과별 본문을 동시에 추출합니다 (블로킹).
+
+    원본 기사나 앞선 결과와 본문이 거의 같은 기사는 요약 전에 버리고,
+    버린 만큼 GNews의 다음 순위 후보를 추출해 결과 수를 채웁니다.
+    """
+    from gnews import GNews
+
+    print(f"...GNews API로 '{query}' 검색 중...")
+    google_news = GNews(language='ko', country='KR', max_results=SEARCH_MAX_RESULTS * max(1, SEARCH_OVERFETCH_FACTOR)) 
+    search_query = query.replace('+', ' ') 
+    started = time.perf_counter()
+    resp = gnews_limiter.call(google_news.get_news, search_query)
+    record_gnews(search_query, time.perf_counter() - started, len(resp))
+
+    duplicates = NearDuplicateFilter()
+    if len(original_text) > SUMMARY_MIN_LENGTH:
+        duplicates.add(original_text)
+
+    hits, cursor, wanted = [], 0, SEARCH_MAX_RESULTS
+    while wanted > 0 and cursor < len(resp) and not _budget_exhausted():
+        batch = resp[cursor:cursor + wanted]
+        cursor += len(batch)
+        accepted, duplicated = {}, []
+
+        def accept(idx, hit):
+            # 추출이 끝난 순서대로 중복을 검사하고 바로 출처를 내보냄 (요약은 source_summary로 나중에).
+            # 그래서 전재 기사끼리는 순위가 아니라 먼저 추출된 쪽이 남음.
+            # 본문이 짧으면 지문이 의미가 없으므로 중복 검사 없이 유지
+            if len(hit['text']) > SUMMARY_MIN_LENGTH and duplicates.is_duplicate(hit['text']):
+                print(f"    - [{hit['source_url']}] 원본/앞선 기사와 중복된 본문. 요약에서 제외합니다.")
+                duplicated.append(idx)
+                return
+            accepted[idx] = hit
+            _emit('source', {'title': hit['title'], 'source_url': hit['source_url'], 'summary': None})
+
+        _run_hits_concurrently(batch, _fetch_search_hit, on_result=accept)
+        hits += [accepted[idx] for idx in sorted(accepted)]
+        wanted = len(duplicated)
+    return hits
+
+
+def _summarizable_hits(hits):
+    # 본문이 충분한 기사만 모아서 한 번에 요약
+    return [hit for hit in hits if len(hit['text']) > SUMMARY_MIN_LENGTH]
+
+
+def _emit(event, payload):
+    """그래프를 stream으로 실행 중이면 사용자 정의 이벤트를 내보냅니다 (그 외에는 무시)."""
+    from langgraph.config import get_stream_writer
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # 그래프 실행 밖(노드 함수를 직접 호출한 경우)에서는 내보낼 곳이 없음
+        return
+    writer({'event': event, 'payload': payload})
+
+
+def _emit_summary(hit, summary):
+    """출처 하나의 요약을 내보냅니다. summary가 None이면 요약에 실패해 근거에서 제외된 출처."""
+    hit['summary_emitted'] = True
+    _emit('source_summary', {'source_url': hit['source_url'], 'summary': summary})
+
+
+def _summary_emitter(hits):
+    """요약 캐시에 있던 기사는 Gemini 요약을 기다리지 않고 바로 내보내는 on_cached 콜백."""
+    return lambda idx, summary: _emit_summary(hits[idx], summary)
+
+
+# 초안 프롬프트와 유사 판정 인덱스에 넣는 근거 기사 필드
+EVIDENCE_FIELDS = ('title', 'summary', 'source_url')
+
+
+def _evidence(article):
+    return {field: article[field] for field in EVIDENCE_FIELDS}
+
+
+def _apply_search_result(state: NewsState, hits, summarizable, summaries):
+    for hit, summary in zip(summarizable, summaries):
+        hit['summary'] = summary
+
+    # 요약하지 못한 기사는 근거가 아니므로 제외 (모두 빠지면 검색 실패로 라우팅)
+    evidence = [hit for hit in hits if hit.get('summary') not in (None, SUMMARY_FAILED_MESSAGE)]
+    if len(evidence) < len(hits):
+        print(f"...요약 실패한 기사 {len(hits) - len(evidence)}개를 근거에서 제외합니다.")
+    # 추출 방식(fetch_tier)은 페이지 로드 지표(record_page_load)에만 남기고, 프롬프트에는 넣지 않음
+    article_list = [_evidence(hit) for hit in evidence]
+    # 캐시에서 이미 내보낸 요약을 뺀 나머지는 일괄 요약 호출이 끝난 지금 내보냄
+    kept = {id(hit) for hit in evidence}
+    for hit in hits:
+        if not hit.get('summary_emitted'):
+            _emit_summary(hit, hit['summary'] if id(hit) in kept else None)
         
     print(f"...검색/요약 완료. 총 {len(article_list)}개 기사 처리.")
     state['article_result'] = article_list
     return state
 
+
+def _search_and_summarize(state: NewsState):
+    query = state['keyword_summary']
+    if query == "추출된_기사_없음":
+        return state
+    if _budget_exhausted():
+        degrade(f"'{query}' 검색 생략")
+        return state
+
+    hits = _collect_search_hits(query, state['article_text'])
+    summarizable = _summarizable_hits(hits)
+    summaries = _summarize_within_budget([hit['text'] for hit in summarizable], _summary_emitter(summarizable))
+    return _apply_search_result(state, hits, summarizable, summaries)
+
+
+async def _asearch_and_summarize(state: NewsState):
+    query = state['keyword_summary']
+    if query == "추출된_기사_없음":
+        return state
+    if _budget_exhausted():
+        degrade(f"'{query}' 검색 생략")
+        return state
+
+    hits = await _run_blocking(_collect_search_hits, query, state['article_text'])
+    summarizable = _summarizable_hits(hits)
+    summaries = await _asummarize_within_budget([hit['text'] for hit in summarizable], _summary_emitter(summarizable))
+    return _apply_search_result(state, hits, summarizable, summaries)
+
+
 # 2-1. 1차 뉴스 검색
 def search_initial(state: NewsState):
     print(f"\n[Node 2: search_initial] 🔍 1차 뉴스 검색 시도 (쿼리: {state['keyword_summary']})...")
     return _search_and_summarize(state)
 
 
+async def asearch_initial(state: NewsState):
+    print(f"\n[Node 2: search_initial] 🔍 1차 뉴스 검색 시도 (쿼리: {state['keyword_summary']})...")
+    return await _asearch_and_summarize(state)
+
+
 # --- 3. 검색 실패 시 키워드 정제 ---
-def refine_keyword(state: NewsState):
-    print("\n[Node 3: refine_keyword] 🔄 1차 검색 실패. 키워드 정제 시도...")
-    current_query = state['search_queries'][-1]
-    
-    prompt = ChatPromptTemplate([
+REFINE_KEYWORD_PROMPT = ChatPromptTemplate([
         ('system', '당신은 검색 실패를 복구하는 검색어 정제 전문가입니다. 최초 검색어가 너무 구체적이어서 결과가 나오지 않았습니다.'),
         ('human', '''
             최초 쿼리: "{current_query}"
@@ -293,36 +883,149 @@ def refine_keyword(state: NewsState):
             정제된 키워드: "트럼프 푸틴 정상회담"
         ''')
     ])
-    
-    chain = prompt | llm | StrOutputParser()
-    raw_query = chain.invoke({'current_query': current_query}).strip()
-    
-    refined_query = " ".join(raw_query.split())
+
+
+def _apply_refined_keyword(state: NewsState, raw_query: str):
+    refined_query = " ".join(raw_query.strip().split())
     
     state['keyword_summary'] = refined_query
     state['search_queries'].append(refined_query) 
     print(f"...정제된 키워드: {refined_query}")
     return state
 
+
+def refine_keyword(state: NewsState):
+    print("\n[Node 3: refine_keyword] 🔄 1차 검색 실패. 키워드 정제 시도...")
+    chain = REFINE_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+    query = state['search_queries'][-1]
+    return _apply_refined_keyword(state, _query_within_budget(chain, {'current_query': query}, _title_query(query, 2)))
+
+
+async def arefine_keyword(state: NewsState):
+    print("\n[Node 3: refine_keyword] 🔄 1차 검색 실패. 키워드 정제 시도...")
+    chain = REFINE_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+    query = state['search_queries'][-1]
+    return _apply_refined_keyword(state, await _aquery_within_budget(chain, {'current_query': query}, _title_query(query, 2)))
+
 # --- 4. 2차 뉴스 검색 ---
 def search_refined(state: NewsState):
     print(f"\n[Node 4: search_refined] 🔍 2차 뉴스 검색 시도 (쿼리: {state['keyword_summary']})...")
     return _search_and_summarize(state)
 
 
-# --- 5. 팩트체크 초안 생성 ---
-def generate_draft(state: NewsState):
-    print("\n[Node 5: generate_draft] 📝 팩트체크 초안 생성 중...")
-    original_title = state['article_title']
-    original_text = state['article_text']
-    article_result = state['article_result']
-    
-    if not article_result:
-        print("...검색된 기사가 없어 '판단 불가' 초안 생성.")
-        state['fact_check'] = f"**{state['search_queries']}** 키워드로 구글 뉴스 검색 결과, 관련 기사를 찾을 수 없습니다. 뉴스 검색 결과 없이는 팩트체크 판단이 불가능합니다. 정보의 출처와 신뢰도를 직접 확인해 보세요."
+async def asearch_refined(state: NewsState):
+    print(f"\n[Node 4: search_refined] 🔍 2차 뉴스 검색 시도 (쿼리: {state['keyword_summary']})...")
+    return await _asearch_and_summarize(state)
+
+
+# --- 1~4. 추측 실행 검색 (speculative_search 모드) ---
+def _clean_query(raw_query: str):
+    return " ".join(raw_query.strip().split())
+
+
+def _title_query(text: str, words: int = 3):
+    # 예산이 부족해 LLM 없이 만드는 검색어 (앞쪽 단어 몇 개)
+    return " ".join(text.split()[:words])
+
+
+def _query_within_budget(chain, inputs, fallback):
+    try:
+        return _clean_query(_within_budget(chain.invoke, inputs))
+    except TimeoutError:
+        degrade(f"검색어 생성 시간 초과 ('{fallback}'로 대체)")
+        return fallback
+
+
+async def _aquery_within_budget(chain, inputs, fallback):
+    try:
+        return _clean_query(await _awithin_budget(chain.ainvoke(inputs)))
+    except TimeoutError:
+        degrade(f"검색어 생성 시간 초과 ('{fallback}'로 대체)")
+        return fallback
+
+
+def _speculative_branches(title: str):
+    """(1차 키워드 생성, 1차 키워드 기반 정제 키워드 생성) 작업을 만듭니다.
+
+    정제 키워드는 two_step 모드의 refine_keyword와 같이 1차 키워드에서 만들되, 1차 검색과 동시에
+    미리 생성하고, 그 검색은 1차 검색 결과가 없을 때만 시작합니다 (GNews/본문 추출은 스레드에서
+    중간에 멈출 수 없어 버려질 검색을 미리 돌리지 않음).
+    """
+    initial_chain = INITIAL_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+    refine_chain = REFINE_KEYWORD_PROMPT | get_llm() | StrOutputParser()
+
+    def initial_query():
+        return _query_within_budget(initial_chain, {'title': title}, _title_query(title))
+
+    def refined_query(query):
+        return _query_within_budget(refine_chain, {'current_query': query}, _title_query(query, 2))
+
+    async def ainitial_query():
+        return await _aquery_within_budget(initial_chain, {'title': title}, _title_query(title))
+
+    async def arefined_query(query):
+        return await _aquery_within_budget(refine_chain, {'current_query': query}, _title_query(query, 2))
+
+    return initial_query, refined_query, ainitial_query, arefined_query
+
+
+def speculative_search(state: NewsState):
+    print("\n[Node 1~4: speculative_search] 🔍 1차 키워드 검색 중 정제 키워드를 미리 생성...")
+    if _skip_initial_keyword(state):
+        return state
+    initial_query, refined_query, _, _ = _speculative_branches(state['article_title'])
+
+    _apply_initial_keyword(state, initial_query())
+    refined_future = _blocking_executor.submit(contextvars.copy_context().run, refined_query, state['keyword_summary'])
+    try:
+        hits = _collect_search_hits(state['keyword_summary'], state['article_text'])
+        if not hits:
+            print("...1차 검색 결과 없음. 미리 생성한 정제 키워드로 검색합니다.")
+            _apply_refined_keyword(state, refined_future.result())
+            hits = _collect_search_hits(state['keyword_summary'], state['article_text'])
+    finally:
+        # 1차 결과를 쓰면 정제 키워드는 버림. 이미 시작한 동기 호출은 멈출 수 없어 Gemini 호출 1회가 추가로 듦
+        refined_future.cancel()
+
+    summarizable = _summarizable_hits(hits)
+    summaries = _summarize_within_budget([hit['text'] for hit in summarizable], _summary_emitter(summarizable))
+    return _apply_search_result(state, hits, summarizable, summaries)
+
+
+async def aspeculative_search(state: NewsState):
+    print("\n[Node 1~4: speculative_search] 🔍 1차 키워드 검색 중 정제 키워드를 미리 생성...")
+    if _skip_initial_keyword(state):
         return state
+    _, _, ainitial_query, arefined_query = _speculative_branches(state['article_title'])
+
+    _apply_initial_keyword(state, await ainitial_query())
+    refined_task = asyncio.ensure_future(arefined_query(state['keyword_summary']))
+    # 버린 쪽에서 난 예외가 "never retrieved" 경고로 남지 않도록 회수
+    refined_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    try:
+        hits = await _run_blocking(_collect_search_hits, state['keyword_summary'], state['article_text'])
+        if not hits:
+            print("...1차 검색 결과 없음. 미리 생성한 정제 키워드로 검색합니다.")
+            _apply_refined_keyword(state, await refined_task)
+            hits = await _run_blocking(_collect_search_hits, state['keyword_summary'], state['article_text'])
+    finally:
+        # 비동기 LLM 호출은 취소하면 요청도 중단됨
+        refined_task.cancel()
+
+    summarizable = _summarizable_hits(hits)
+    summaries = await _asummarize_within_budget([hit['text'] for hit in summarizable], _summary_emitter(summarizable))
+    return _apply_search_result(state, hits, summarizable, summaries)
+
 
-    prompt = ChatPromptTemplate([
+# --- 5. 팩트체크 초안 생성 ---
+# 프롬프트 압축 모드: report(기본, 원문 전송 + 절감량만 기록), on(압축본 전송, 품질 확인 후 선택), off
+PROMPT_COMPRESSION = os.environ.get("PROMPT_COMPRESSION", "report").lower()
+# 평가 프롬프트의 JSON 스키마를 들여쓰기 없이 넣을지 여부 (기본: 압축 모드가 on일 때만)
+PROMPT_COMPACT_SCHEMA = os.environ.get("PROMPT_COMPACT_SCHEMA", "1" if PROMPT_COMPRESSION == 'on' else "0") == "1"
+# 압축 시 원본 기사 본문에 허용하는 추정 토큰 수
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "600"))
+
+DRAFT_PROMPT = ChatPromptTemplate([
         ('system','당신은 전문 팩트체커입니다. 검색된 근거를 바탕으로 사실 여부 판단 초안을 작성하세요.'),
         ('human', '''
             다음 '원본 기사'와 '뉴스 검색 결과(요약)'를 기반으로 사실 여부를 판단하고 상세히 서술한 **최종 결과**를 작성하세요.
@@ -337,48 +1040,93 @@ def generate_draft(state: NewsState):
             2. '원본 기사'가 사실인지 거짓인지 최종 결론을 내리세요.
     ''')])
 
-    chain = prompt | llm | StrOutputParser()
-    result = chain.invoke({
-        'original_title': original_title,
-        'original_text': original_text,
+
+def _draft_inputs(state: NewsState):
+    """초안 프롬프트 입력을 만듭니다. 검색 결과가 없으면 '판단 불가' 초안을 채우고 None을 반환합니다."""
+    print("\n[Node 5: generate_draft] 📝 팩트체크 초안 생성 중...")
+    article_result = state['article_result']
+    
+    if not article_result:
+        print("...검색된 기사가 없어 '판단 불가' 초안 생성.")
+        state['fact_check'] = f"**{state['search_queries']}** 키워드로 구글 뉴스 검색 결과, 관련 기사를 찾을 수 없습니다. 뉴스 검색 결과 없이는 팩트체크 판단이 불가능합니다. 정보의 출처와 신뢰도를 직접 확인해 보세요."
+        return None
+
+    inputs = {
+        'original_title': state['article_title'],
+        'original_text': state['article_text'],
         'article_result': article_result 
-    })
+    }
+    if PROMPT_COMPRESSION == 'off':
+        return inputs
+
+    keywords = state['search_queries'] + [state['keyword_summary']]
+    compressed_text, sources, report = compress_draft_inputs(
+        state['article_title'], state['article_text'], article_result, keywords, PROMPT_TOKEN_BUDGET
+    )
+    record_prompt_compression('generate_draft', report)
+    print(f"...프롬프트 압축({PROMPT_COMPRESSION}): 추정 토큰 {report['original_tokens']} → {report['compressed_tokens']} "
+          f"({report['saved_ratio']:.0%} 절감, 문장 {report['kept_sentences']}/{report['total_sentences']})")
+    if PROMPT_COMPRESSION == 'on':
+        inputs.update(original_text=compressed_text, article_result=sources)
+    return inputs
+
 
+def _apply_draft(state: NewsState, result: str):
     state['fact_check'] = result 
     print("...최종 결과 텍스트 생성 완료.")
     return state
 
 
-# --- 7. 평가 ---
-def evaluate(state: NewsState):
-    print("\n[Node 7: evaluate] ⚖️ 최종 평가 및 점수 산출 중 (JSON Mode)...")
-    fact_result = state['fact_check']
-    
-    error_reasoning = "분석 불가 또는 LLM 오류로 근거 생성 실패"
-    
+def _timeout_draft(state: NewsState):
+    """초안 생성이 예산 안에 끝나지 않으면 수집된 근거 목록을 초안 대신 평가에 넘깁니다."""
+    degrade("초안 생성 시간 초과 (수집된 근거 목록으로 평가)")
+    state['fact_check'] = (
+        "시간 제한으로 상세 분석 없이 수집된 근거만 정리했습니다.\n\n"
+        f"원본 기사 제목: {state['article_title']}\n\n"
+        f"뉴스 검색 결과(요약):\n{serialize_sources(state['article_result'])}"
+    )
+    return state
+
+
+def _draft_from_inputs(state: NewsState, inputs):
+    """_draft_inputs로 만든 입력으로 초안을 생성합니다 (단일 호출 실패 시 입력을 다시 만들지 않도록 분리)."""
+    chain = DRAFT_PROMPT | get_llm() | StrOutputParser()
     try:
-        if "판단이 불가능합니다." in fact_result:
-            print("...판단 불가 상태로 최종 평가.")
-            state['verdict'] = EvaluationVerdict(
-                exaggeration_score=0.5,
-                exaggeration_reasoning="판단 근거가 부족하여 점수를 0.5로 설정합니다.",
-                lack_of_sources_score=1.0, 
-                lack_of_sources_reasoning="검색된 관련 기사가 없어 출처 부족 점수를 1.0으로 설정합니다.",
-                logical_errors_score=0.5,
-                logical_errors_reasoning="판단 근거가 부족하여 점수를 0.5로 설정합니다.",
-                overall_fake_probability=0.7,
-                final_judgment=fact_result
-            )
-            return state
+        return _apply_draft(state, _within_budget(chain.invoke, inputs))
+    except TimeoutError:
+        return _timeout_draft(state)
+
+
+async def _adraft_from_inputs(state: NewsState, inputs):
+    chain = DRAFT_PROMPT | get_llm() | StrOutputParser()
+    try:
+        return _apply_draft(state, await _awithin_budget(chain.ainvoke(inputs)))
+    except TimeoutError:
+        return _timeout_draft(state)
+
+
+def generate_draft(state: NewsState):
+    inputs = _draft_inputs(state)
+    if inputs is None:
+        return state
+    return _draft_from_inputs(state, inputs)
+
+
+async def agenerate_draft(state: NewsState):
+    inputs = _draft_inputs(state)
+    if inputs is None:
+        return state
+    return await _adraft_from_inputs(state, inputs)
 
-        json_schema_str = EvaluationVerdict.schema_json(indent=2)
-        escaped_json_schema_str = json_schema_str.replace('{', '{{').replace('}', '}}')
 
-        prompt = ChatPromptTemplate([
+# --- 7. 평가 ---
+# PROMPT_COMPACT_SCHEMA이면 들여쓰기 없는 스키마로 평가 프롬프트의 입력 토큰 절감
+_verdict_schema_str = EvaluationVerdict.schema_json(indent=None if PROMPT_COMPACT_SCHEMA else 2).replace('{', '{{').replace('}', '}}')
+EVALUATE_PROMPT = ChatPromptTemplate([
             ('system', f'''당신은 가짜 뉴스 탐지 전문가입니다. 다음 팩트체크 결과를 기반으로 뉴스 신뢰도를 평가하고, **반드시** JSON 형식으로 점수를 출력하세요. JSON은 아래 스키마를 완벽하게 따라야 합니다.
 
     스키마:
-    {escaped_json_schema_str}
+    {_verdict_schema_str}
     '''), 
             ('human', '''
         다음 팩트체크 결과를 기반으로 뉴스의 신뢰도를 평가하고, 각 항목 점수를 0.0~1.0 사이로 배점하세요.
@@ -389,34 +1137,141 @@ def evaluate(state: NewsState):
         결과를 바탕으로 다음 항목에 대한 점수와 **각 점수에 대한 간략한 근거(1-2문장)**를 정확하게 판단하고, 최종 판단 문장을 작성하세요.
         **주의:** 출력은 반드시 유효한 JSON 객체여야 하며, 어떤 설명이나 추가 텍스트 없이 JSON 객체만을 출력해야 합니다.
     ''')])
-        
-        chain = prompt | llm_json | StrOutputParser()
-        
-        json_string = chain.invoke({'fact_result': fact_result})
-        
-        if json_string.strip().startswith("```json"):
-            json_string = json_string.strip()[7:-3].strip()
-        
-        result_dict = json.loads(json_string)
-        state['verdict'] = EvaluationVerdict(**result_dict) 
-        
-        print("...JSON 평가 및 점수 산출 완료.")
-        
+
+
+def _no_evidence_verdict(state: NewsState):
+    """검색 근거가 없어 '판단 불가'인 경우 LLM 없이 판정을 채웁니다. 해당하면 True."""
+    print("\n[Node 7: evaluate] ⚖️ 최종 평가 및 점수 산출 중 (JSON Mode)...")
+    fact_result = state['fact_check']
+    if "판단이 불가능합니다." not in fact_result:
+        return False
+
+    print("...판단 불가 상태로 최종 평가.")
+    state['verdict'] = EvaluationVerdict(
+        exaggeration_score=0.5,
+        exaggeration_reasoning="판단 근거가 부족하여 점수를 0.5로 설정합니다.",
+        lack_of_sources_score=1.0, 
+        lack_of_sources_reasoning="검색된 관련 기사가 없어 출처 부족 점수를 1.0으로 설정합니다.",
+        logical_errors_score=0.5,
+        logical_errors_reasoning="판단 근거가 부족하여 점수를 0.5로 설정합니다.",
+        overall_fake_probability=0.7,
+        final_judgment=fact_result
+    )
+    return True
+
+
+def _apply_verdict_json(state: NewsState, json_string: str):
+    result_dict = json.loads(_strip_json_fence(json_string))
+    state['verdict'] = EvaluationVerdict(**result_dict) 
+    print("...JSON 평가 및 점수 산출 완료.")
+    return state
+
+
+def _error_verdict(state: NewsState, e: Exception):
+    print(f"JSON 처리/LLM 호출 최종 오류 발생: {e}")
+    if isinstance(e, TimeoutError):
+        degrade("평가 시간 초과")
+    error_reasoning = "분석 불가 또는 LLM 오류로 근거 생성 실패"
+    state['verdict'] = EvaluationVerdict(
+        exaggeration_score=1.0, 
+        exaggeration_reasoning=error_reasoning,
+        lack_of_sources_score=1.0,
+        lack_of_sources_reasoning=error_reasoning,
+        logical_errors_score=1.0,
+        logical_errors_reasoning=error_reasoning,
+        overall_fake_probability=1.0, 
+        final_judgment=f"LLM 호출 실패 또는 JSON 파싱 오류 발생: {e.__class__.__name__}"
+    )
+    return state
+
+
+def evaluate(state: NewsState):
+    try:
+        if _no_evidence_verdict(state):
+            return state
+        chain = EVALUATE_PROMPT | get_llm_json() | StrOutputParser()
+        return _apply_verdict_json(state, _within_budget(chain.invoke, {'fact_result': state['fact_check']}))
     except Exception as e:
-        print(f"JSON 처리/LLM 호출 최종 오류 발생: {e}")
-        state['verdict'] = EvaluationVerdict(
-            exaggeration_score=1.0, 
-            exaggeration_reasoning=error_reasoning,
-            lack_of_sources_score=1.0,
-            lack_of_sources_reasoning=error_reasoning,
-            logical_errors_score=1.0,
-            logical_errors_reasoning=error_reasoning,
-            overall_fake_probability=1.0, 
-            final_judgment=f"LLM 호출 실패 또는 JSON 파싱 오류 발생: {e.__class__.__name__}"
-        )
+        return _error_verdict(state, e)
+
+
+async def aevaluate(state: NewsState):
+    try:
+        if _no_evidence_verdict(state):
+            return state
+        chain = EVALUATE_PROMPT | get_llm_json() | StrOutputParser()
+        return _apply_verdict_json(state, await _awithin_budget(chain.ainvoke({'fact_result': state['fact_check']})))
+    except Exception as e:
+        return _error_verdict(state, e)
+
+# --- 5+7. 초안과 평가를 한 번의 호출로 생성 (single_call 모드) ---
+_fact_check_verdict_schema_str = FactCheckVerdict.schema_json(indent=None if PROMPT_COMPACT_SCHEMA else 2).replace('{', '{{').replace('}', '}}')
+DRAFT_AND_EVALUATE_PROMPT = ChatPromptTemplate([
+        ('system', f'''당신은 전문 팩트체커이자 가짜 뉴스 탐지 전문가입니다. 검색된 근거를 바탕으로 사실 여부를 판단하고 신뢰도를 평가하여, **반드시** JSON 형식으로 출력하세요. JSON은 아래 스키마를 완벽하게 따라야 합니다.
+
+    스키마:
+    {_fact_check_verdict_schema_str}
+    '''),
+        ('human', '''
+            다음 '원본 기사'와 '뉴스 검색 결과(요약)'를 기반으로 사실 여부를 판단하세요.
+
+            원본 기사 제목: {original_title}
+            원본 기사 본문: {original_text}
             
+            뉴스 검색 결과(요약): {article_result}
+
+            지침:
+            1. fact_check: '원본 기사'의 핵심 주장이 '뉴스 검색 결과'와 일치하는지 비교 분석하고, 사실인지 거짓인지 최종 결론까지 상세히 서술하세요.
+            2. 각 점수는 0.0~1.0 사이로 배점하세요. 0점에 가까우면 진실이고, 1점에 가까우면 거짓입니다. 각 점수에는 간략한 근거(1-2문장)를 붙이세요.
+            3. final_judgment에는 점수를 종합한 최종 판단 문장을 작성하세요.
+            **주의:** 출력은 반드시 유효한 JSON 객체여야 하며, 어떤 설명이나 추가 텍스트 없이 JSON 객체만을 출력해야 합니다.
+    ''')])
+
+
+def _apply_draft_and_verdict_json(state: NewsState, json_string: str):
+    """단일 호출 응답을 검증해 fact_check와 verdict를 채웁니다. 형식이 맞지 않으면 예외를 던집니다."""
+    result = FactCheckVerdict(**json.loads(_strip_json_fence(json_string)))
+    if not result.fact_check.strip():
+        raise ValueError("fact_check 서술이 비어 있습니다.")
+    state['fact_check'] = result.fact_check
+    state['verdict'] = EvaluationVerdict(**result.dict(exclude={'fact_check'}))
+    print("...초안과 JSON 평가를 한 번에 생성 완료.")
     return state
 
+
+def draft_and_evaluate(state: NewsState):
+    inputs = _draft_inputs(state)
+    if inputs is None:
+        return evaluate(state)
+    print("\n[Node 5+7: draft_and_evaluate] 📝⚖️ 초안 + 평가 단일 호출 중 (JSON Mode)...")
+    try:
+        chain = DRAFT_AND_EVALUATE_PROMPT | get_llm_json() | StrOutputParser()
+        return _apply_draft_and_verdict_json(state, _within_budget(chain.invoke, inputs))
+    except TimeoutError:
+        # 다시 시도할 시간이 없으므로 근거 목록으로 바로 평가 (남은 전체 시간을 평가에 사용)
+        with node_budget():
+            return evaluate(_timeout_draft(state))
+    except Exception as e:
+        print(f"...단일 호출 결과 검증 실패 ({e.__class__.__name__}: {e}). 2단계 방식으로 다시 시도합니다.")
+        return evaluate(_draft_from_inputs(state, inputs))
+
+
+async def adraft_and_evaluate(state: NewsState):
+    inputs = _draft_inputs(state)
+    if inputs is None:
+        return await aevaluate(state)
+    print("\n[Node 5+7: draft_and_evaluate] 📝⚖️ 초안 + 평가 단일 호출 중 (JSON Mode)...")
+    try:
+        chain = DRAFT_AND_EVALUATE_PROMPT | get_llm_json() | StrOutputParser()
+        return _apply_draft_and_verdict_json(state, await _awithin_budget(chain.ainvoke(inputs)))
+    except TimeoutError:
+        with node_budget():
+            return await aevaluate(_timeout_draft(state))
+    except Exception as e:
+        print(f"...단일 호출 결과 검증 실패 ({e.__class__.__name__}: {e}). 2단계 방식으로 다시 시도합니다.")
+        return await aevaluate(await _adraft_from_inputs(state, inputs))
+
+
 # --- 8. 검색 결과에 따른 라우팅 로직 ---
 def route_on_search_result(state: NewsState):
     print("\n[Router] 🧭 검색 결과 라우팅...")
@@ -430,51 +1285,369 @@ def route_on_search_result(state: NewsState):
         print("...1차 검색 실패. 키워드 정제로 이동.")
         return "search_fail" 
 
+# --- 9. URL 기반 판정 결과 캐시 ---
+VERDICT_CACHE_TTL = float(os.environ.get("VERDICT_CACHE_TTL", str(6 * 60 * 60)))
+VERDICT_CACHE_MAX_ENTRIES = int(os.environ.get("VERDICT_CACHE_MAX_ENTRIES", "5000"))
+
+# 캐시 키에서 제거할 추적용 파라미터
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'spm', 'cmpid'}
+
+verdict_cache = SQLiteTTLCache('verdict_cache', ttl=VERDICT_CACHE_TTL, max_entries=VERDICT_CACHE_MAX_ENTRIES)
+
+
+def canonicalize_url(url: str) -> str:
+    """추적 파라미터와 fragment를 제거하고 정렬해 같은 기사를 같은 키로 만듭니다."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme.lower() or 'https', host, path, '', urlencode(query), ''))
+
+
+def serialize_state(state: NewsState) -> dict:
+    """NewsState를 JSON으로 저장할 수 있는 dict로 변환합니다."""
+    data = dict(state)
+    if state.get('verdict') is not None:
+        data['verdict'] = state['verdict'].dict()
+    return data
+
+
+def deserialize_state(data: dict) -> NewsState:
+    state = NewsState(**data)
+    if data.get('verdict') is not None:
+        state['verdict'] = EvaluationVerdict(**data['verdict'])
+    return state
+
+
+def is_complete_result(state: NewsState) -> bool:
+    """본문 추출 실패, LLM 오류, 시간 예산 부족처럼 다시 시도하면 달라질 수 있는 결과가 아니면 True."""
+    verdict = state.get('verdict')
+    if verdict is None or not state.get('article_text') or state.get('degraded'):
+        return False
+    return not verdict.final_judgment.startswith("LLM 호출 실패")
+
+
+def _is_cacheable(state: NewsState) -> bool:
+    # 사전 선별의 잠정 판정은 캐시하지 않음 (캐시 키에 prescreen 설정이 없어 전체 검증 요청에도 반환되므로)
+    if state.get('prescreen', {}).get('routed'):
+        return False
+    return is_complete_result(state)
+
+
 # --- Graph Build and Run ---
-def run_graph(input_data: str):
-    """사용자 입력을 받아 전체 그래프를 실행하고 최종 결과를 반환합니다."""
-    
+# 마감 시간이 있을 때 각 노드가 뒤 단계 몫으로 남겨 두는 전체 시간 비율 (나머지가 그 노드의 예산)
+NODE_RESERVE_FRACTIONS = {
+    'extract_article_text': 0.8,
+    'match_claim': 0.8,
+    'extract_initial_keyword': 0.7,
+    'search_initial': 0.45,
+    'refine_keyword': 0.4,
+    'search_refined': 0.3,
+    'speculative_search': 0.3,
+    'generate_draft': 0.15,
+}
+
+
+def _node(func, afunc):
+    """동기(invoke/stream)와 비동기(ainvoke/astream) 실행을 모두 지원하고, 실행 시간을 기록하는 노드를 만듭니다."""
+    name = func.__name__
+    reserve = NODE_RESERVE_FRACTIONS.get(name, 0.0)
+
+    def timed(state):
+        with node_timer(name), node_budget(reserve):
+            return func(state)
+
+    async def atimed(state):
+        with node_timer(name), node_budget(reserve):
+            return await afunc(state)
+
+    return RunnableLambda(timed, afunc=atimed, name=name)
+
+
+# 그래프 실행 모드: two_step(초안 → 평가 2회 호출), single_call(초안+평가 1회 호출)
+GRAPH_MODES = ('two_step', 'single_call')
+GRAPH_MODE = os.environ.get("GRAPH_MODE", "two_step")
+
+
+# 설정 시 1차 키워드 검색 중에 정제 키워드를 미리 생성 (1차 검색 실패 시 대기 시간 단축).
+# 대신 1차 검색이 성공하는 대부분의 실행에서도 정제 키워드용 Gemini 호출이 1회 더 들어감
+SPECULATIVE_SEARCH = os.environ.get("SPECULATIVE_SEARCH", "0") == "1"
+
+
+def build_graph(mode: str = 'two_step', speculative: bool = False, prescreen: bool = False):
+    """LangGraph 상태 그래프를 구성하고 컴파일합니다."""
+    if mode not in GRAPH_MODES:
+        raise ValueError(f"알 수 없는 그래프 모드: {mode} (가능한 값: {', '.join(GRAPH_MODES)})")
+    # single_call 모드는 초안 노드가 평가까지 끝내므로 evaluate로 가는 호출이 하나 줄어듦
+    draft_node = 'draft_and_evaluate' if mode == 'single_call' else 'generate_draft'
+
     builder = StateGraph(NewsState)
-    builder.add_node('extract_article_text', extract_article_text)
-    builder.add_node('extract_initial_keyword', extract_initial_keyword)
-    builder.add_node('search_initial', search_initial)
-    builder.add_node('refine_keyword', refine_keyword)
-    builder.add_node('search_refined', search_refined)
-    builder.add_node('generate_draft', generate_draft)
-    builder.add_node('evaluate', evaluate)
+    builder.add_node('extract_article_text', _node(extract_article_text, aextract_article_text))
+    if prescreen:
+        builder.add_node('prescreen_article', _node(prescreen_article, aprescreen_article))
+    builder.add_node('match_claim', _node(match_claim, amatch_claim))
+    if speculative:
+        builder.add_node('speculative_search', _node(speculative_search, aspeculative_search))
+    else:
+        builder.add_node('extract_initial_keyword', _node(extract_initial_keyword, aextract_initial_keyword))
+        builder.add_node('search_initial', _node(search_initial, asearch_initial))
+        builder.add_node('refine_keyword', _node(refine_keyword, arefine_keyword))
+        builder.add_node('search_refined', _node(search_refined, asearch_refined))
+    if mode == 'single_call':
+        builder.add_node('draft_and_evaluate', _node(draft_and_evaluate, adraft_and_evaluate))
+    else:
+        builder.add_node('generate_draft', _node(generate_draft, agenerate_draft))
+    builder.add_node('evaluate', _node(evaluate, aevaluate))
 
     builder.set_entry_point('extract_article_text') 
-    builder.add_edge("extract_article_text", "extract_initial_keyword")
-    builder.add_edge("extract_initial_keyword", "search_initial")
-    
+    if prescreen:
+        # 확신도가 높은 기사는 검색/LLM 호출 없이 잠정 판정으로 종료
+        builder.add_edge("extract_article_text", "prescreen_article")
+        builder.add_conditional_edges(
+            "prescreen_article",
+            route_on_prescreen,
+            {
+                "provisional": END,
+                "continue": "match_claim",
+            }
+        )
+    else:
+        builder.add_edge("extract_article_text", "match_claim")
     builder.add_conditional_edges(
-        "search_initial", 
-        route_on_search_result, 
+        "match_claim",
+        route_on_claim_match,
         {
-            "search_success": "generate_draft",
-            "search_fail": "refine_keyword",
-            "skip_all": "evaluate" 
+            "returned": END,
+            "seeded": draft_node,
+            "no_match": "speculative_search" if speculative else "extract_initial_keyword",
         }
     )
-    
-    builder.add_edge("refine_keyword", "search_refined")
-    builder.add_edge("search_refined", "generate_draft")
-    builder.add_edge("generate_draft", "evaluate")
+    if speculative:
+        # 정제 키워드 검색까지 한 노드에서 끝나므로 검색 실패여도 바로 초안으로 이동
+        builder.add_conditional_edges(
+            "speculative_search",
+            route_on_search_result,
+            {
+                "search_success": draft_node,
+                "search_fail": draft_node,
+                "skip_all": "evaluate"
+            }
+        )
+    else:
+        builder.add_edge("extract_initial_keyword", "search_initial")
+        
+        builder.add_conditional_edges(
+            "search_initial", 
+            route_on_search_result, 
+            {
+                "search_success": draft_node,
+                "search_fail": "refine_keyword",
+                "skip_all": "evaluate" 
+            }
+        )
+        
+        builder.add_edge("refine_keyword", "search_refined")
+        builder.add_edge("search_refined", draft_node)
+    if mode == 'single_call':
+        builder.add_edge("draft_and_evaluate", END)
+    else:
+        builder.add_edge("generate_draft", "evaluate")
     builder.add_edge("evaluate", END)
 
-    graph = builder.compile()
+    return builder.compile()
+
 
-    initial_state = NewsState(
+# 설정 시 http://127.0.0.1:<METRICS_PORT>/metrics 로 Prometheus 지표 노출
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+_compiled_graphs = {}
+_graph_lock = threading.Lock()
+
+
+def get_graph(mode: str = None, speculative: bool = None, prescreen: bool = None):
+    """모드별로 컴파일된 그래프를 프로세스당 한 번만 만들어 재사용합니다."""
+    key = (mode or GRAPH_MODE, SPECULATIVE_SEARCH if speculative is None else speculative,
+           PRESCREEN_ENABLED if prescreen is None else prescreen)
+    with _graph_lock:
+        if key not in _compiled_graphs:
+            _compiled_graphs[key] = build_graph(*key)
+            if METRICS_PORT:
+                start_metrics_server(METRICS_PORT)
+    return _compiled_graphs[key]
+
+
+def _initial_state(input_data: str, use_claim_index: bool = True, use_prescreen: bool = True) -> NewsState:
+    return NewsState(
         input_type='url',
         input=input_data,
         article_title="",
         article_text="",
+        article_fetch_tier="",
         article_result=[],
         search_queries=[],
         keyword_summary="",
         fact_check="",
         verdict=None,
         reference="",
+        cache_hit=False,
+        cached_at=0.0,
+        use_claim_index=use_claim_index,
+        claim_match={},
+        use_prescreen=use_prescreen,
+        prescreen={},
+        degraded=False,
+        degraded_reasons=[],
+        metrics={},
     ) 
-    
-    return graph.invoke(initial_state)
\ No newline at end of file
+
+
+def _mark_degraded(result: NewsState, budget):
+    if budget is not None and budget.degraded:
+        result['degraded'] = True
+        result['degraded_reasons'] = list(budget.reasons)
+
+
+def _cached_result(cache_key: str):
+    entry = verdict_cache.get_entry(cache_key)
+    if entry is None:
+        return None
+    print(f"\n[Cache] ⚡ 캐시된 판정 결과 사용 ({cache_key})")
+    state = deserialize_state(entry[0])
+    state['cache_hit'] = True
+    state['cached_at'] = entry[1]
+    return state
+
+
+def _store_result(cache_key: str, result: NewsState):
+    if _is_cacheable(result):
+        result['cached_at'] = time.time()
+        verdict_cache.set(cache_key, serialize_state(result))
+        _index_claim(cache_key, result)
+
+
+# run_graph 전체에 주는 기본 마감 시간(초). 0이면 제한 없음
+RUN_DEADLINE_SECONDS = float(os.environ.get("RUN_DEADLINE_SECONDS", "0"))
+
+
+class _GraphRun:
+    """실행 하나의 상태. result가 None이면(캐시 미적중) 호출한 쪽이 graph로 initial_state를 실행해 채웁니다."""
+
+    def __init__(self, result=None, graph=None, initial_state=None):
+        self.result = result
+        self.graph = graph
+        self.initial_state = initial_state
+
+
+@contextmanager
+def _graph_run(input_data: str, use_cache: bool, force_refresh: bool, mode: str, speculative: bool,
+               deadline: float, prescreen: bool):
+    """run_graph/arun_graph/stream_graph가 공유하는 마감 시간, 실행 지표, 판정 캐시 조회와 저장.
+
+    세 진입점은 안쪽에서 그래프를 어떻게 실행하는지(invoke/ainvoke/stream)만 다릅니다.
+    """
+    deadline = RUN_DEADLINE_SECONDS if deadline is None else deadline
+    with collect_run_metrics() as run_metrics, run_deadline(deadline) as budget:
+        cache_key = canonicalize_url(input_data)
+        cached = _cached_result(cache_key) if use_cache and not force_refresh else None
+        if cached is not None:
+            run = _GraphRun(result=cached)
+        else:
+            run = _GraphRun(
+                graph=get_graph(mode, speculative, prescreen),
+                initial_state=_initial_state(input_data, use_claim_index=use_cache and not force_refresh,
+                                             use_prescreen=not force_refresh),
+            )
+        yield run
+        if cached is None:
+            _mark_degraded(run.result, budget)
+            if use_cache:
+                _store_result(cache_key, run.result)
+        run.result['metrics'] = run_metrics.finish()
+
+
+async def arun_graph(input_data: str, use_cache: bool = True, force_refresh: bool = False, mode: str = None,
+                     speculative: bool = None, deadline: float = None, prescreen: bool = None):
+    """run_graph의 비동기 버전. Gemini 호출은 ainvoke로, 브라우저/GNews 작업은
+    공용 스레드 풀에서 실행되므로 하나의 이벤트 루프에서 여러 팩트체크를 동시에 돌릴 수 있습니다.
+
+    Gemini 비동기 클라이언트는 프로세스당 한 번 만들어 처음 사용한 이벤트 루프의 연결을 계속 쓰므로,
+    계속 살아 있는 하나의 루프에서만 호출하세요 (호출마다 asyncio.run으로 새 루프를 만들면 두 번째
+    실행부터 "Event loop is closed"로 실패함).
+    """
+    with _graph_run(input_data, use_cache, force_refresh, mode, speculative, deadline, prescreen) as run:
+        if run.result is None:
+            run.result = await run.graph.ainvoke(run.initial_state)
+    return run.result
+
+
+# stream_graph에서 토큰 단위로 내보낼 노드
+TOKEN_STREAM_NODES = {'generate_draft'}
+
+
+def stream_graph(input_data: str, use_cache: bool = True, force_refresh: bool = False, mode: str = None,
+                 speculative: bool = None, deadline: float = None, prescreen: bool = None):
+    """그래프를 실행하면서 진행 상황을 (이벤트, 데이터) 튜플로 하나씩 내보냅니다.
+
+    - ('node', (노드 이름, 갱신된 상태)): 노드 하나가 끝날 때마다
+    - ('source', 기사 dict): 검색 결과 기사 본문을 추출할 때마다 (summary는 None)
+    - ('source_summary', {'source_url', 'summary'}): 기사 요약이 준비되면. 요약 캐시에 있던 기사는
+      바로, 나머지는 한 번의 일괄 요약 호출이 끝난 뒤 함께 도착함 (summary가 None이면 근거에서 제외)
+    - ('token', 문자열): generate_draft가 생성하는 텍스트 토큰
+    - ('final', NewsState): 마지막 결과 (캐시 적중 시 이 이벤트만 발생)
+    """
+    with _graph_run(input_data, use_cache, force_refresh, mode, speculative, deadline, prescreen) as run:
+        if run.result is None:
+            run.result = yield from _stream_events(run.initial_state, run.graph)
+    yield 'final', run.result
+
+
+def _stream_events(initial_state: NewsState, graph):
+    result = None
+    for mode, chunk in graph.stream(initial_state, stream_mode=["updates", "messages", "custom", "values"]):
+        if mode == "updates":
+            for node_name, update in chunk.items():
+                yield 'node', (node_name, update)
+        elif mode == "messages":
+            message, metadata = chunk
+            if metadata.get('langgraph_node') in TOKEN_STREAM_NODES:
+                content = message.content
+                if isinstance(content, list):
+                    content = "".join(part if isinstance(part, str) else part.get('text', '') for part in content)
+                if content:
+                    yield 'token', content
+        elif mode == "custom":
+            yield chunk['event'], chunk['payload']
+        elif mode == "values":
+            result = chunk
+    return result
+
+
+def run_graph(input_data: str, use_cache: bool = True, force_refresh: bool = False, mode: str = None,
+              speculative: bool = None, deadline: float = None, prescreen: bool = None):
+    """사용자 입력을 받아 전체 그래프를 실행하고 최종 결과를 반환합니다.
+
+    use_cache가 켜져 있으면 같은 기사(정규화 URL)의 최근 결과를 바로 반환하고,
+    force_refresh=True이면 캐시를 무시하고 다시 검사한 뒤 캐시를 갱신합니다.
+    mode는 'two_step'(기본) 또는 'single_call'이며, 지정하지 않으면 GRAPH_MODE 환경 변수를 따릅니다.
+    speculative=True이면 1차 검색 중에 정제 키워드를 미리 생성합니다 (기본: SPECULATIVE_SEARCH 환경 변수).
+    1차 검색이 실패할 때의 대기 시간을 줄이는 대신, 1차 검색이 성공해도 버려지는 정제 키워드 생성으로
+    실행마다 Gemini 호출이 1회 늘어납니다 (two_step 기준 약 4회 → 5회).
+    deadline(초)을 주면 실행 전체를 그 안에 끝내도록 노드마다 남은 예산을 나눠 주고, 예산이 끝나
+    생략한 작업이 있으면 모인 근거만으로 판정한 뒤 결과의 degraded를 True로 표시합니다
+    (기본: RUN_DEADLINE_SECONDS 환경 변수, 0이면 제한 없음).
+    prescreen=True이면 본문 추출 직후 도메인 평판/어휘 특징으로 사전 선별해, 확신도가 높은 기사는
+    검색과 LLM 호출 없이 잠정 판정을 반환합니다 (기본: PRESCREEN_ENABLED 환경 변수, force_refresh 시 생략).
+    그래프를 동기 invoke로 실행하므로 이벤트 루프 안팎 어디서 불러도 되고, 한 프로세스에서 여러 번
+    불러도 Gemini 비동기 클라이언트를 닫힌 이벤트 루프에 묶어 두지 않습니다.
+    """
+    with _graph_run(input_data, use_cache, force_refresh, mode, speculative, deadline, prescreen) as run:
+        if run.result is None:
+            run.result = run.graph.invoke(run.initial_state)
+    return run.result
@@ -2,7 +2,39 @@ import streamlit as st
 from langchain_core.documents import Document
 from langchain_core.runnables import Runnable
 from typing import List, Dict
-from agent import run_graph, EvaluationVerdict # run_graph를 직접 호출
+from datetime import datetime
+import os
+from agent import stream_graph, EvaluationVerdict # 그래프를 스트리밍으로 실행
+
+# 설정 시 그래프를 직접 실행하지 않고 팩트체크 서비스(service.py)에 요청 (같은 URL 요청은 서비스에서 합쳐짐)
+FAKENEWS_API_URL = os.environ.get("FAKENEWS_API_URL")
+
+# 진행 상황 표시용 노드 설명
+NODE_LABELS = {
+    'extract_article_text': "🕵️ 기사 본문 추출",
+    'prescreen_article': "🚦 도메인 평판/표현 특징 사전 선별",
+    'match_claim': "🗂️ 과거 판정 중 같은 주장 검색",
+    'extract_initial_keyword': "🧠 검색 키워드 추출",
+    'search_initial': "🔍 1차 뉴스 검색 및 요약",
+    'refine_keyword': "🔄 검색 키워드 정제",
+    'search_refined': "🔍 2차 뉴스 검색 및 요약",
+    'speculative_search': "🔍 뉴스 검색 및 요약 (정제 키워드 미리 생성)",
+    'generate_draft': "📝 팩트체크 결과 작성",
+    'draft_and_evaluate': "📝⚖️ 팩트체크 결과 작성 및 평가",
+    'evaluate': "⚖️ 최종 신뢰도 평가",
+}
+
+
+def render_source(slot, title, url, summary, excluded=False):
+    """출처 하나를 표시합니다. 요약이 아직 없으면 요약 중으로, 요약에 실패했으면 근거 제외로 표시."""
+    if excluded:
+        note = "요약하지 못해 근거에서 제외했습니다."
+    elif summary is None:
+        note = "요약 중..."
+    else:
+        note = summary
+    slot.markdown(f"**📎 [{title}]({url})**  \n> *{note}*")
+
 
 # 봇 만들기
 st.set_page_config(page_title="🕵️ FakeNews", page_icon="🛡️", layout="wide")
@@ -19,6 +51,7 @@ with st.container(border=True):
     query = st.text_input("🔗 뉴스 URL 입력", placeholder="예: https://www.chosun.com/politics/2025/10/27/...")
     
     col1, col2, col3 = st.columns([1, 1, 1])
+    force_refresh = col3.checkbox("🔄 캐시 무시하고 다시 검사", help="이전에 분석한 기사라도 처음부터 다시 팩트체크합니다.")
     
     if col2.button("🔍 신뢰도 확인하기", use_container_width=True, type="primary") and query.strip():
         
@@ -26,21 +59,71 @@ with st.container(border=True):
             st.error("🚨 유효한 URL 형식이 아닙니다. 'http://' 또는 'https://'로 시작하는 주소를 입력해 주세요.")
             st.stop()
 
-        with st.spinner("⏳ 팩트체크 에이전트가 뉴스를 분석하고 있습니다..."):
+        # 노드가 끝날 때마다 중간 결과를 바로 보여줌 (전체 파이프라인 완료를 기다리지 않음)
+        result = None
+        with st.status("⏳ 팩트체크 에이전트가 뉴스를 분석하고 있습니다...", expanded=True) as status:
+            draft_text = ""
+            draft_slot = None
+            source_slots = {}
             try:
-                result = run_graph(query) 
+                if FAKENEWS_API_URL:
+                    from service import ServiceClient
+                    events = ServiceClient(FAKENEWS_API_URL).stream(query, force_refresh=force_refresh)
+                else:
+                    events = stream_graph(query, force_refresh=force_refresh)
+                for event, payload in events:
+                    if event == 'node':
+                        node_name, update = payload
+                        status.update(label=f"{NODE_LABELS.get(node_name, node_name)} 완료")
+                        if node_name == 'extract_article_text' and update.get('article_title'):
+                            st.markdown(f"**📰 기사 제목:** {update['article_title']}")
+                        elif node_name in ('extract_initial_keyword', 'refine_keyword', 'speculative_search') and update.get('keyword_summary'):
+                            st.markdown(f"**🔑 검색 키워드:** `{update['keyword_summary']}`")
+                        elif node_name == 'generate_draft' and draft_slot is not None:
+                            draft_slot.markdown(update['fact_check'])
+                    elif event == 'source':
+                        # 본문 추출 즉시 출처를 보여 주고, 요약은 준비되는 대로(일괄 요약이라 대개 한꺼번에) 채움
+                        source_slots[payload['source_url']] = (st.empty(), payload['title'])
+                        render_source(*source_slots[payload['source_url']], payload['source_url'], payload['summary'])
+                    elif event == 'source_summary' and payload['source_url'] in source_slots:
+                        render_source(*source_slots[payload['source_url']], payload['source_url'], payload['summary'],
+                                      excluded=payload['summary'] is None)
+                    elif event == 'token':
+                        if draft_slot is None:
+                            st.markdown("**📝 팩트체크 결과 작성 중...**")
+                            draft_slot = st.empty()
+                        draft_text += payload
+                        draft_slot.markdown(draft_text + "▌")
+                    elif event == 'final':
+                        result = payload
             except Exception as e:
+                status.update(label="❌ 분석 중 오류 발생", state="error")
                 st.error(f"❌ LangGraph 실행 중 치명적인 오류가 발생했습니다: {type(e).__name__}")
                 st.exception(e)
                 st.stop()
+            status.update(label="✅ 분석 완료", state="complete", expanded=False)
 
 
         if result is None or 'verdict' not in result:
             st.error("🚨 **시스템 오류:** 분석 결과 객체를 생성하지 못했습니다. 입력 URL을 확인해주세요.")
             st.stop()
 
-        # 소요 시간은 run_graph에서 계산된 후 result에 포함되어야 함 (현재는 N/A)
-        st.success(f"✅ 분석 완료: AI 평가 결과입니다.") 
+        metrics = result.get('metrics') or {}
+        elapsed = metrics.get('total_seconds')
+        st.success(f"✅ 분석 완료: AI 평가 결과입니다. (소요 시간: {f'{elapsed:.1f}초' if elapsed is not None else 'N/A'})") 
+        if result.get('cache_hit'):
+            cached_at = datetime.fromtimestamp(result['cached_at']).strftime('%Y-%m-%d %H:%M')
+            st.info(f"⚡ {cached_at}에 분석한 결과를 캐시에서 바로 불러왔습니다. 최신 결과가 필요하면 '캐시 무시하고 다시 검사'를 선택하세요.")
+        claim_match = result.get('claim_match') or {}
+        if claim_match.get('mode') == 'returned':
+            st.info(f"🗂️ 같은 주장을 다룬 기사 [{claim_match['title']}]({claim_match['url']})의 판정(유사도 {claim_match['score']:.2f}, {claim_match.get('age', 0.0) / 60:.0f}분 전 판정)을 재사용했습니다. 최신 결과가 필요하면 '캐시 무시하고 다시 검사'를 선택하세요.")
+        elif claim_match.get('mode') == 'seeded':
+            st.info(f"🗂️ 같은 주장을 다룬 기사 [{claim_match['title']}]({claim_match['url']})의 검색 근거(유사도 {claim_match['score']:.2f})로 팩트체크했습니다.")
+        if (result.get('prescreen') or {}).get('routed'):
+            st.info("🚦 도메인 평판과 기사 표현만으로 확신도가 높아 검색/교차 검증 없이 잠정 판정했습니다. 전체 검증이 필요하면 '캐시 무시하고 다시 검사'를 선택하세요.")
+        if result.get('degraded'):
+            reasons = ", ".join(result.get('degraded_reasons') or [])
+            st.warning(f"⏱️ 시간 제한으로 일부 작업을 생략하고 그때까지 모은 근거로 판정했습니다 ({reasons}). 시간 여유를 두고 다시 검사하면 결과가 달라질 수 있습니다.")
         
         verdict: EvaluationVerdict = result['verdict']
         overall_score = verdict.overall_fake_probability
@@ -101,6 +184,16 @@ with st.container(border=True):
             else:
                 st.info("관련 기사를 찾지 못하여 외부 검증 없이 판단되었습니다.")
 
+        # 4. 성능 지표 (노드별 시간, 페이지 로드, Gemini 호출/토큰, 캐시)
+        if metrics:
+            with st.expander("⏱️ 성능 지표 (Performance)"):
+                llm_stats = metrics.get('llm', {})
+                m1, m2, m3 = st.columns(3)
+                m1.metric("전체 소요 시간", f"{elapsed:.1f}s" if elapsed is not None else "N/A")
+                m2.metric("Gemini 호출 수", llm_stats.get('calls', 0))
+                m3.metric("토큰 (입력/출력)", f"{llm_stats.get('input_tokens', 0)} / {llm_stats.get('output_tokens', 0)}")
+                st.json(metrics, expanded=False)
+
         st.divider()
         
         st.subheader("📊 항목별 상세 점수 및 근거")
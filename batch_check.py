@@ -0,0 +1,155 @@
+"""여러 뉴스 URL을 한꺼번에 팩트체크하는 배치 실행기.
+
+URL 목록(JSONL/CSV/텍스트, 파일 또는 stdin)을 읽어 프로세스 여러 개로 run_graph를
+실행하고, 끝나는 대로 결과를 JSONL로 기록합니다. 완료한 URL은 체크포인트 파일에
+남기므로 중간에 끊겨도 같은 명령으로 다시 실행하면 남은 URL만 처리합니다.
+
+사용 예:
+    python batch_check.py urls.jsonl -o verdicts.jsonl --workers 4
+    cat urls.txt | python batch_check.py - -o verdicts.jsonl --format txt
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from agent import canonicalize_url
+
+
+def read_urls(source, fmt):
+    """입력에서 URL을 순서대로 읽습니다. JSONL은 "url" 키(또는 문자열), CSV는 url 컬럼(없으면 첫 컬럼)."""
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8', newline='')
+    if fmt == 'auto':
+        ext = os.path.splitext(source)[1].lower()
+        fmt = {'.jsonl': 'jsonl', '.json': 'jsonl', '.csv': 'csv'}.get(ext, 'txt')
+    try:
+        if fmt == 'csv':
+            reader = csv.reader(stream)
+            header = next(reader, None)
+            if header is None:
+                return
+            column = header.index('url') if 'url' in header else 0
+            if 'url' not in header and header[column].startswith('http'):
+                yield header[column].strip()
+            for row in reader:
+                if len(row) > column and row[column].strip():
+                    yield row[column].strip()
+        else:
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                if fmt == 'jsonl':
+                    record = json.loads(line)
+                    yield (record['url'] if isinstance(record, dict) else record).strip()
+                else:
+                    yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def check_url(url, force_refresh):
+    """워커 프로세스에서 URL 하나를 팩트체크하고 JSON으로 저장할 레코드를 반환합니다."""
+    from agent import is_complete_result, run_graph, serialize_state
+
+    start = time.perf_counter()
+    try:
+        result = run_graph(url, force_refresh=force_refresh)
+        # 일시적 실패(LLM 오류, 본문 추출 실패, 시간 제한)는 실패로 남겨 재시작 시 다시 검사
+        record = {'url': url, 'ok': is_complete_result(result), 'result': serialize_state(result)}
+    except Exception as e:
+        record = {'url': url, 'ok': False, 'error': f"{e.__class__.__name__}: {e}"}
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lower, upper = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def print_report(latencies, succeeded, failed, cache_hits, skipped, wall_seconds):
+    latencies = sorted(latencies)
+    processed = succeeded + failed
+    print("\n===== 배치 팩트체크 결과 =====")
+    print(f"처리: {processed}건 (성공 {succeeded}, 실패 {failed}, 캐시 적중 {cache_hits}) / 체크포인트로 건너뜀 {skipped}건")
+    print(f"소요 시간: {wall_seconds:.1f}s, 처리량: {processed / wall_seconds if wall_seconds else 0.0:.2f} URL/s")
+    if latencies:
+        print("지연 시간(s): " + ", ".join(
+            f"p{pct}={percentile(latencies, pct):.2f}" for pct in (50, 90, 95, 99)
+        ) + f", max={latencies[-1]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="뉴스 URL 목록 일괄 팩트체크")
+    parser.add_argument("input", help="URL 목록 파일 경로 ('-'이면 stdin)")
+    parser.add_argument("-o", "--output", required=True, help="결과를 이어 쓸 JSONL 경로")
+    parser.add_argument("--format", choices=['auto', 'jsonl', 'csv', 'txt'], default='auto', help="입력 형식")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="동시에 실행할 프로세스 수")
+    parser.add_argument("--checkpoint", help="완료 URL 체크포인트 경로 (기본: <output>.checkpoint)")
+    parser.add_argument("--force-refresh", action="store_true", help="판정 캐시를 무시하고 다시 검사")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    done = load_checkpoint(checkpoint_path)
+    print(f"체크포인트에서 완료된 URL {len(done)}건을 불러왔습니다.")
+
+    latencies, succeeded, failed, cache_hits, skipped = [], 0, 0, 0, 0
+    seen = set()
+    start = time.perf_counter()
+
+    with open(args.output, 'a', encoding='utf-8') as out, open(checkpoint_path, 'a', encoding='utf-8') as ckpt, \
+            ProcessPoolExecutor(max_workers=args.workers) as executor:
+        in_flight = {}
+
+        def drain(block_until_below):
+            nonlocal succeeded, failed, cache_hits
+            while len(in_flight) >= block_until_below:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = in_flight.pop(future)
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    latencies.append(record['elapsed'])
+                    if record['ok']:
+                        succeeded += 1
+                        cache_hits += bool(record['result'].get('cache_hit'))
+                        # 결과를 먼저 기록한 뒤 체크포인트를 남겨, 재시작 시 누락이 없도록 함
+                        ckpt.write(key + "\n")
+                        ckpt.flush()
+                        os.fsync(ckpt.fileno())
+                    else:
+                        failed += 1
+                    print(f"[{succeeded + failed}] {'✅' if record['ok'] else '❌'} {record['url']} ({record['elapsed']:.1f}s)")
+
+        for url in read_urls(args.input, args.format):
+            key = canonicalize_url(url)
+            if key in done or key in seen:
+                skipped += key in done
+                continue
+            seen.add(key)
+            # 입력 전체를 한꺼번에 큐에 넣지 않도록 진행 중인 작업 수를 워커의 2배로 제한
+            drain(args.workers * 2)
+            in_flight[executor.submit(check_url, url, args.force_refresh)] = key
+        drain(1)
+
+    print_report(latencies, succeeded, failed, cache_hits, skipped, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+"""API 쿼터와 실제 사이트 없이 돌리는 오프라인 성능 벤치마크.
+
+다음 대역(stand-in)을 사용합니다.
+  - FakeGemini: 지연 시간을 설정할 수 있는 가짜 ChatGoogleGenerativeAI
+    (키워드/요약/초안 텍스트와 EvaluationVerdict 형식의 JSON을 돌려줌)
+  - gnews.GNews.get_news / googlenewsdecoder.new_decoderv1 스텁
+  - 로컬 HTTP 서버: 네이버(#articleBodyContents), 다음(#dic_area),
+    네이트(#article_body), 일반 레이아웃의 fixture 페이지 제공
+
+동시 실행 수별로 노드별/전체 지연 시간과 처리량을 측정하고 JSON으로 저장합니다.
+--check-repeat-runs는 측정 대신 한 프로세스에서 run_graph(배치 실행기의 check_url)를 연달아
+호출해도 실패하지 않는지 확인합니다 (가짜 Gemini도 실제 클라이언트처럼 처음 쓴 이벤트 루프에 묶임).
+
+사용 예:
+    python benchmarks/offline.py --concurrency 1 4 8 --runs 16
+    python benchmarks/offline.py --compare benchmarks/results/offline-20261017-120000.json
+    python benchmarks/offline.py --check-repeat-runs
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+RESULT_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+LAYOUTS = ('naver', 'daum', 'nate', 'generic')
+
+
+class StandInConfig:
+    llm_latency = 0.8
+    gnews_latency = 0.5
+    decode_latency = 0.3
+    site_latency = 0.1
+    base_url = ""
+
+
+config = StandInConfig()
+
+
+# --- 로컬 뉴스 사이트 ---
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        layout = self.path.strip('/').split('/')[0]
+        if layout not in LAYOUTS:
+            self.send_error(404)
+            return
+        time.sleep(config.site_latency)
+        with open(os.path.join(FIXTURE_DIR, f"{layout}.html"), 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server
+
+
+# --- GNews / Google News 디코더 스텁 ---
+class FakeGNews:
+    def __init__(self, language='ko', country='KR', max_results=3, **kwargs):
+        self.max_results = max_results
+
+    def get_news(self, query):
+        time.sleep(config.gnews_latency)
+        # 실행마다 다른 링크를 돌려줘 디코딩 캐시가 측정을 가리지 않도록 함
+        return [
+            {'title': f"{query} 관련 기사 {idx + 1}", 'url': f"https://news.google.com/rss/articles/{layout}-{uuid.uuid4().hex}"}
+            for idx, layout in zip(range(self.max_results), itertools.cycle(LAYOUTS))
+        ]
+
+
+def fake_new_decoderv1(url, interval=None):
+    time.sleep(config.decode_latency)
+    layout, _, nonce = url.rsplit('/', 1)[-1].partition('-')
+    return {'status': True, 'decoded_url': f"{config.base_url}/{layout}/{nonce}"}
+
+
+def install_search_stubs():
+    sys.modules['gnews'] = types.SimpleNamespace(GNews=FakeGNews)
+    sys.modules['googlenewsdecoder'] = types.SimpleNamespace(new_decoderv1=fake_new_decoderv1)
+
+
+# --- 가짜 Gemini ---
+def canned_response(prompt, json_mode):
+    if json_mode and "[기사 " in prompt:
+        indices = sorted({int(idx) for idx in re.findall(r"\[기사 (\d+)\]", prompt)})
+        return json.dumps({'summaries': [
+            {'index': idx, 'summary': f"{idx}번 기사는 정책 발표 내용과 이에 대한 각계 반응을 전했다."} for idx in indices
+        ]}, ensure_ascii=False)
+    if json_mode:
+        # single_call 모드 프롬프트의 스키마에는 fact_check 서술 필드가 포함됨
+        narrative = {'fact_check': "원본 기사의 핵심 주장은 검색된 여러 기사와 일치합니다. 사실로 판단됩니다."} if "fact_check" in prompt else {}
+        return json.dumps({
+            **narrative,
+            'exaggeration_score': 0.2,
+            'exaggeration_reasoning': "검색된 기사들과 수치가 일치합니다.",
+            'lack_of_sources_score': 0.1,
+            'lack_of_sources_reasoning': "여러 언론사가 같은 내용을 보도했습니다.",
+            'logical_errors_score': 0.1,
+            'logical_errors_reasoning': "주장과 근거의 연결에 문제가 없습니다.",
+            'overall_fake_probability': 0.15,
+            'final_judgment': "복수의 보도로 확인되는 사실에 가까운 기사입니다.",
+        }, ensure_ascii=False)
+    if "검색어 정제" in prompt:
+        return "청년 주거 지원"
+    if "키워드를 추출" in prompt:
+        return "정부 청년 주거 예산"
+    if "요약하세요" in prompt:
+        return "기사는 정책 발표 내용과 이에 대한 각계 반응을 전했다."
+    return "원본 기사의 핵심 주장은 검색된 여러 기사와 일치합니다. 수치와 일정이 동일하게 보도되어 사실로 판단됩니다."
+
+
+# 가짜 Gemini별로 처음 비동기 호출에 사용한 이벤트 루프
+_bound_loops = {}
+
+
+def build_fake_llm(json_mode, callbacks):
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class FakeGemini(BaseChatModel):
+        model: str = "fake-gemini"
+        latency: float = 0.8
+        json_mode: bool = False
+
+        @property
+        def _llm_type(self):
+            return "fake-gemini"
+
+        def _result(self, messages):
+            prompt = "\n".join(str(message.content) for message in messages)
+            content = canned_response(prompt, self.json_mode)
+            input_tokens, output_tokens = len(prompt) // 2, len(content) // 2
+            message = AIMessage(content=content, usage_metadata={
+                'input_tokens': input_tokens, 'output_tokens': output_tokens, 'total_tokens': input_tokens + output_tokens,
+            })
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.latency)
+            return self._result(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            # 실제 클라이언트(httpx AsyncClient)처럼 처음 사용한 이벤트 루프의 연결을 재사용하므로,
+            # 그 루프가 닫힌 뒤 다른 루프에서 호출하면 실패
+            loop = asyncio.get_running_loop()
+            bound = _bound_loops.setdefault(id(self), loop)
+            if bound is not loop and bound.is_closed():
+                raise RuntimeError("Event loop is closed")
+            await asyncio.sleep(self.latency)
+            return self._result(messages)
+
+    return FakeGemini(latency=config.llm_latency, json_mode=json_mode, callbacks=callbacks)
+
+
+def load_agent():
+    """대역을 설치한 뒤 agent를 불러옵니다 (캐시는 임시 DB, LLM 캐시는 비활성)."""
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark-dummy-key")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["FAKENEWS_CACHE_DB"] = os.path.join(tempfile.mkdtemp(prefix="fakenews-bench-"), "cache.sqlite3")
+    # 대역의 지연 시간이 측정을 결정하도록 초당 호출 제한은 기본으로 끔 (환경 변수로 지정하면 그대로 사용)
+    for backend in ('GEMINI', 'GNEWS', 'DECODER'):
+        os.environ.setdefault(f"RATE_LIMIT_{backend}_RPS", "0")
+    sys.path.insert(0, REPO_ROOT)
+    install_search_stubs()
+
+    import agent
+    from ratelimit import rate_limited_runnable
+    # 실제 클라이언트와 같이 재시도/동시 실행 제한 래퍼를 씌움
+    fake_text = rate_limited_runnable(build_fake_llm(False, [agent.llm_metrics_callback]), agent.gemini_limiter)
+    fake_json = rate_limited_runnable(build_fake_llm(True, [agent.llm_metrics_callback]), agent.gemini_limiter)
+    agent.get_llm = lambda: fake_text
+    agent.get_llm_json = lambda: fake_json
+    return agent
+
+
+# --- 측정 ---
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * pct / 100
+    lower, upper = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def describe(values):
+    return {
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'max': max(values) if values else 0.0,
+    }
+
+
+async def run_level(agent, concurrency, runs, mode=None, speculative=False, deadline=0.0, prescreen=False):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(idx):
+        url = f"{config.base_url}/{LAYOUTS[idx % len(LAYOUTS)]}/input-{idx}"
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await agent.arun_graph(url, use_cache=False, mode=mode, speculative=speculative,
+                                                deadline=deadline, prescreen=prescreen)
+                return time.perf_counter() - start, {**(result.get('metrics') or {}), 'degraded': result.get('degraded', False)}, None
+            except Exception as e:
+                return time.perf_counter() - start, {}, f"{e.__class__.__name__}: {e}"
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(idx) for idx in range(runs)))
+    wall = time.perf_counter() - start
+
+    node_values = {}
+    for _, metrics, _ in outcomes:
+        for node, seconds in metrics.get('nodes', {}).items():
+            node_values.setdefault(node, []).append(seconds)
+    errors = [error for _, _, error in outcomes if error]
+    # tier별 페이지 로드 시간/전송량 (빠른 브라우징 프로필 전후 비교용)
+    page_loads = {}
+    for _, metrics, _ in outcomes:
+        for load in metrics.get('page_loads', []):
+            page_loads.setdefault(load['tier'], []).append(load)
+    return {
+        'concurrency': concurrency,
+        'runs': runs,
+        'errors': len(errors),
+        'degraded': sum(1 for _, m, _ in outcomes if m.get('degraded')),
+        'prescreen_skipped_fraction': sum(1 for _, m, _ in outcomes if m.get('prescreen', {}).get('routed')) / runs,
+        'error_samples': errors[:3],
+        'wall_seconds': wall,
+        'throughput_per_min': runs / wall * 60 if wall else 0.0,
+        'end_to_end': describe([elapsed for elapsed, _, _ in outcomes]),
+        'nodes': {node: describe(values) for node, values in sorted(node_values.items())},
+        'page_loads': {
+            tier: {
+                'count': len(loads),
+                'seconds': describe([load['seconds'] for load in loads]),
+                'mean_bytes': sum(load.get('bytes', 0) for load in loads) / len(loads),
+                'mean_blocked': sum(load.get('blocked', 0) for load in loads) / len(loads),
+            }
+            for tier, loads in sorted(page_loads.items())
+        },
+        'llm_calls_per_run': sum(m.get('llm', {}).get('calls', 0) for _, m, _ in outcomes) / runs,
+        'input_tokens_per_run': sum(m.get('llm', {}).get('input_tokens', 0) for _, m, _ in outcomes) / runs,
+    }
+
+
+async def run_levels(agent, args):
+    """모든 동시 실행 수를 하나의 이벤트 루프에서 측정합니다 (Gemini 비동기 클라이언트는 루프 하나에 묶임)."""
+    levels = []
+    for concurrency in args.concurrency:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            level = await run_level(agent, concurrency, args.runs, args.graph_mode, args.speculative_search,
+                                    args.deadline, args.prescreen)
+        print_level(level)
+        levels.append(level)
+    return levels
+
+
+def check_repeat_runs(verbose=False):
+    """한 프로세스에서 check_url(run_graph)을 두 번 연달아 불러 둘 다 성공하는지 확인합니다.
+
+    배치 실행기의 워커 프로세스는 URL마다 run_graph를 부르므로, 두 번째 호출부터 실패하면
+    배치 전체가 끝나지 않습니다. 성공하면 True."""
+    import batch_check
+    records = []
+    for idx in range(2):
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            records.append(batch_check.check_url(f"{config.base_url}/{LAYOUTS[idx]}/repeat-{idx}", True))
+    for idx, record in enumerate(records, 1):
+        print(f"{idx}번째 run_graph: {'성공' if record['ok'] else '실패'} ({record['elapsed']:.1f}s) {record.get('error', '')}")
+    return all(record['ok'] for record in records)
+
+
+def print_level(level):
+    e2e = level['end_to_end']
+    print(f"\n[동시 실행 {level['concurrency']}] {level['runs']}회, 오류 {level['errors']}건, 시간 제한 {level.get('degraded', 0)}건, "
+          f"처리량 {level['throughput_per_min']:.1f}건/분, 전체 p50 {e2e['p50']:.2f}s / p95 {e2e['p95']:.2f}s, "
+          f"LLM 호출 {level['llm_calls_per_run']:.1f}회/건, 사전 선별 종료 {level.get('prescreen_skipped_fraction', 0.0):.0%}")
+    for node, stats in level['nodes'].items():
+        print(f"    {node:<26} mean {stats['mean']:.2f}s  p95 {stats['p95']:.2f}s")
+    for tier, stats in level.get('page_loads', {}).items():
+        print(f"    page[{tier}]{'':<{20 - len(tier)}} mean {stats['seconds']['mean']:.2f}s  "
+              f"{stats['mean_bytes'] / 1024:.1f} KB/page  차단 {stats['mean_blocked']:.1f}건/page")
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {level['concurrency']: level for level in json.load(f)['levels']}
+    print(f"\n===== 이전 결과 대비 ({previous_path}) =====")
+    for level in current['levels']:
+        before = previous.get(level['concurrency'])
+        if before is None:
+            continue
+        for label, now, then in (
+            ("p50", level['end_to_end']['p50'], before['end_to_end']['p50']),
+            ("p95", level['end_to_end']['p95'], before['end_to_end']['p95']),
+            ("처리량", level['throughput_per_min'], before['throughput_per_min']),
+        ):
+            change = (now - then) / then * 100 if then else 0.0
+            print(f"  동시 {level['concurrency']:<3} {label:<5} {then:8.2f} -> {now:8.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 fact-check 파이프라인 벤치마크")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1, 4, 8], help="측정할 동시 실행 수 목록")
+    parser.add_argument("--runs", type=int, default=8, help="동시 실행 수별 실행 횟수")
+    parser.add_argument("--llm-latency", type=float, default=config.llm_latency, help="가짜 Gemini 응답 지연(초)")
+    parser.add_argument("--gnews-latency", type=float, default=config.gnews_latency, help="GNews 검색 지연(초)")
+    parser.add_argument("--decode-latency", type=float, default=config.decode_latency, help="URL 디코딩 지연(초)")
+    parser.add_argument("--site-latency", type=float, default=config.site_latency, help="fixture 페이지 응답 지연(초)")
+    parser.add_argument("--graph-mode", choices=['two_step', 'single_call'], default='two_step', help="그래프 실행 모드")
+    parser.add_argument("--speculative-search", action="store_true", help="1차 검색 중 정제 키워드 미리 생성")
+    parser.add_argument("--deadline", type=float, default=0.0, help="실행별 마감 시간(초, 0이면 제한 없음)")
+    parser.add_argument("--prescreen", action="store_true", help="사전 선별 노드 사용 (잠정 판정으로 끝난 비율 측정)")
+    parser.add_argument("--save", help="결과 JSON 경로 (기본: benchmarks/results/offline-<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 로그 출력")
+    parser.add_argument("--check-repeat-runs", action="store_true",
+                        help="측정 대신 한 프로세스에서 run_graph를 두 번 불러 둘 다 성공하는지 확인")
+    args = parser.parse_args()
+
+    config.llm_latency = args.llm_latency
+    config.gnews_latency = args.gnews_latency
+    config.decode_latency = args.decode_latency
+    config.site_latency = args.site_latency
+
+    server = start_fixture_server()
+    agent = load_agent()
+
+    if args.check_repeat_runs:
+        ok = check_repeat_runs(args.verbose)
+        server.shutdown()
+        sys.exit(0 if ok else 1)
+
+    levels = asyncio.run(run_levels(agent, args))
+    server.shutdown()
+
+    result = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'stand_ins': {
+            'llm_latency': config.llm_latency, 'gnews_latency': config.gnews_latency,
+            'decode_latency': config.decode_latency, 'site_latency': config.site_latency,
+        },
+        'graph_mode': args.graph_mode,
+        'speculative_search': args.speculative_search,
+        'deadline': args.deadline,
+        'prescreen': args.prescreen,
+        'levels': levels,
+    }
+    save_path = args.save or os.path.join(RESULT_DIR, f"offline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {save_path}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""콜드 스타트(임포트 + 첫 요청 준비) 시간 벤치마크.
+
+매 회차마다 새 파이썬 프로세스를 띄워 다음 단계를 측정합니다.
+  - import_agent: `import agent` 소요 시간
+  - compile_graph: 첫 get_graph() (그래프 컴파일)
+  - llm_clients: Gemini 클라이언트 생성
+  - fetch_deps / search_deps: 첫 기사 추출·검색 시 지연 로딩되는 모듈
+
+사용 예:
+    python benchmarks/startup.py --runs 5 --save startup.json
+    python benchmarks/startup.py --baseline startup.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_CODE = r'''
+import json, time
+timings = {}
+
+start = time.perf_counter()
+import agent
+timings['import_agent'] = time.perf_counter() - start
+
+start = time.perf_counter()
+agent.get_graph()
+timings['compile_graph'] = time.perf_counter() - start
+
+start = time.perf_counter()
+agent.get_llm(); agent.get_llm_json()
+timings['llm_clients'] = time.perf_counter() - start
+
+start = time.perf_counter()
+import lxml.html, newspaper, selenium.webdriver
+timings['fetch_deps'] = time.perf_counter() - start
+
+start = time.perf_counter()
+import gnews, googlenewsdecoder
+timings['search_deps'] = time.perf_counter() - start
+
+timings['first_request_ready'] = sum(timings.values())
+print("__TIMINGS__" + json.dumps(timings))
+'''
+
+
+def run_once():
+    env = dict(os.environ)
+    # 클라이언트 생성만 측정하므로 실제 키가 없어도 됨 (네트워크 호출 없음)
+    env.setdefault("GEMINI_API_KEY", "startup-benchmark-dummy-key")
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("__TIMINGS__"):
+            return json.loads(line[len("__TIMINGS__"):])
+    raise RuntimeError(f"측정 결과를 찾지 못했습니다.\n{proc.stdout}\n{proc.stderr}")
+
+
+def summarize(samples):
+    summary = {}
+    for phase in samples[0]:
+        values = sorted(sample[phase] for sample in samples)
+        summary[phase] = {
+            'median': statistics.median(values),
+            'min': values[0],
+            'max': values[-1],
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="agent.py 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="측정 반복 횟수 (회차마다 새 프로세스)")
+    parser.add_argument("--save", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="baseline 대비 허용 증가율 (기본 20%%)")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    summary = summarize(samples)
+
+    print(f"{'phase':<22}{'median(s)':>12}{'min(s)':>10}{'max(s)':>10}")
+    for phase, stats in summary.items():
+        print(f"{phase:<22}{stats['median']:>12.3f}{stats['min']:>10.3f}{stats['max']:>10.3f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({'runs': args.runs, 'python': sys.version.split()[0], 'summary': summary}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['summary']
+        regressions = []
+        for phase in ('import_agent', 'first_request_ready'):
+            before, after = baseline[phase]['median'], summary[phase]['median']
+            if after > before * (1 + args.tolerance):
+                regressions.append(f"{phase}: {before:.3f}s -> {after:.3f}s")
+        if regressions:
+            print("🚨 콜드 스타트 회귀 감지:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("✅ baseline 대비 회귀 없음.")
+
+
+if __name__ == '__main__':
+    main()
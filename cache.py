@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import record_cache
+
+# --- 로컬 디스크 캐시 설정 ---
+CACHE_DIR = os.environ.get("FAKENEWS_CACHE_DIR", ".cache")
+CACHE_DB_PATH = os.environ.get("FAKENEWS_CACHE_DB", os.path.join(CACHE_DIR, "fakenews.sqlite3"))
+
+
+class SQLiteTTLCache:
+    """SQLite에 JSON 값을 저장하는 TTL + 크기 제한(LRU) 캐시.
+
+    여러 캐시가 같은 DB 파일을 테이블만 나누어 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, table, ttl, max_entries, path=CACHE_DB_PATH):
+        if not table.isidentifier():
+            raise ValueError(f"잘못된 캐시 테이블 이름: {table}")
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_last_access ON {self.table}(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_entry(self, key):
+        """(값, 저장 시각)을 반환합니다. 없거나 만료되었으면 None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < now:
+                if row is not None:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                hit = False
+            else:
+                conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += 1
+                hit = True
+        record_cache(self.table, hit)
+        if not hit:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now, expires_at, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+        overflow = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def items(self):
+        """만료되지 않은 (키, 값, 저장 시각)을 모두 반환합니다."""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT key, value, created_at FROM {self.table} WHERE expires_at >= ?", (time.time(),)
+            ).fetchall()
+        return [(key, json.loads(value), created_at) for key, value, created_at in rows]
+
+    def delete(self, key):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': size,
+            'max_entries': self.max_entries,
+        }
@@ -0,0 +1,151 @@
+"""과거 판정 결과의 로컬 유사도 인덱스.
+
+같은 주장을 다른 언론사가 다른 URL로 보도하면 URL 캐시로는 찾을 수 없으므로,
+(제목, 본문 앞부분)을 해시된 글자 3-gram TF-IDF 벡터로 만들어 코사인 유사도로
+비슷한 과거 판정을 찾습니다. 조회는 검색 키워드를 만들기 전에 하므로, 문서와 조회 모두
+키워드 없이 같은 필드로만 벡터를 만듭니다. 네트워크나 GPU 없이 동작하며, 판정이 저장될 때마다
+역색인에 바로 추가됩니다(SQLite에도 저장해 재시작 후 다시 불러옴).
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+from cache import SQLiteTTLCache
+
+# --- 유사 판정 인덱스 설정 ---
+CLAIM_INDEX_ENABLED = os.environ.get("CLAIM_INDEX_ENABLED", "1") == "1"
+CLAIM_INDEX_TTL = float(os.environ.get("CLAIM_INDEX_TTL", str(24 * 60 * 60)))
+CLAIM_INDEX_MAX_ENTRIES = int(os.environ.get("CLAIM_INDEX_MAX_ENTRIES", "20000"))
+# 해시 벡터 차원 (2^20)
+CLAIM_INDEX_DIM = 1 << 20
+# 인덱싱/비교에 사용하는 본문 앞부분 길이 (리드 문단에 핵심 주장이 있는 경우가 많음)
+CLAIM_TEXT_CHARS = 600
+
+
+def _features(title, text):
+    """제목(가중치 2배)과 본문 앞부분의 글자 3-gram을 해시한 빈도를 반환합니다."""
+    counts = Counter()
+    for part, weight in ((title, 2), (text[:CLAIM_TEXT_CHARS], 1)):
+        normalized = " ".join(part.lower().split())
+        for idx in range(len(normalized) - 2):
+            gram = normalized[idx:idx + 3]
+            if gram.strip():
+                h = int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+                counts[h % CLAIM_INDEX_DIM] += weight
+    return counts
+
+
+class ClaimIndex:
+    """해시된 n-gram TF-IDF 역색인. 추가는 즉시 반영되고 조회는 후보 문서만 비교합니다."""
+
+    def __init__(self, table='claim_index', ttl=CLAIM_INDEX_TTL, max_entries=CLAIM_INDEX_MAX_ENTRIES):
+        self.store = SQLiteTTLCache(table, ttl=ttl, max_entries=max_entries)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._loaded = False
+        # 추가된 순서(= indexed_at 순서)를 유지해 가장 오래된 문서부터 정리
+        self._docs = {}
+        self._postings = {}
+        # 문서 벡터 길이 캐시 (문서 수가 10% 넘게 늘어 IDF가 달라지면 다시 계산)
+        self._norms = {}
+        self._norm_docs = 0
+
+    def _ensure_loaded(self):
+        # 첫 조회 때 디스크에 저장된 판정으로 인덱스를 다시 만듦
+        if not self._loaded:
+            records = sorted(((record, key) for key, record, _ in self.store.items()),
+                             key=lambda item: item[0].get('indexed_at', 0.0))
+            for record, key in records:
+                self._add_locked(key, record)
+            self._loaded = True
+
+    def _add_locked(self, key, record):
+        if key in self._docs:
+            self._remove_locked(key)
+        tf = _features(record['title'], record.get('text', ''))
+        self._docs[key] = (tf, record)
+        for feature in tf:
+            self._postings.setdefault(feature, set()).add(key)
+        if len(self._docs) > self._norm_docs * 1.1:
+            self._norms.clear()
+            self._norm_docs = len(self._docs)
+
+    def _remove_locked(self, key):
+        tf, _ = self._docs.pop(key)
+        self._norms.pop(key, None)
+        for feature in tf:
+            postings = self._postings.get(feature)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[feature]
+
+    def _prune_locked(self, now):
+        """만료된 문서와 max_entries를 넘는 가장 오래된 문서를 메모리 인덱스에서 뺍니다."""
+        while self._docs:
+            key = next(iter(self._docs))
+            expired = now - self._docs[key][1].get('indexed_at', now) > self.ttl
+            if not expired and len(self._docs) <= self.max_entries:
+                break
+            self._remove_locked(key)
+
+    def _idf(self, feature):
+        return math.log((len(self._docs) + 1) / (len(self._postings.get(feature, ())) + 1)) + 1.0
+
+    def _weight(self, count, feature):
+        return (1.0 + math.log(count)) * self._idf(feature)
+
+    def _doc_norm(self, key):
+        norm = self._norms.get(key)
+        if norm is None:
+            tf = self._docs[key][0]
+            norm = self._norms[key] = math.sqrt(sum(self._weight(count, feature) ** 2 for feature, count in tf.items()))
+        return norm
+
+    def add(self, key, record):
+        """판정 레코드를 인덱스와 디스크에 추가합니다 (같은 키는 교체)."""
+        record = {**record, 'indexed_at': time.time()}
+        self.store.set(key, record)
+        with self._lock:
+            self._ensure_loaded()
+            self._add_locked(key, record)
+            self._prune_locked(record['indexed_at'])
+
+    def search(self, title, text="", top_k=3, min_score=0.0, exclude_key=None):
+        """유사도가 min_score 이상인 (점수, 키, 레코드)를 점수 높은 순으로 반환합니다."""
+        now = time.time()
+        with self._lock:
+            self._ensure_loaded()
+            self._prune_locked(now)
+            query = {feature: self._weight(count, feature) for feature, count in _features(title, text).items()}
+            query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+            if not query_norm:
+                return []
+            # 역색인으로 공통 n-gram이 있는 문서만 내적을 누적
+            dots = {}
+            for feature, weight in query.items():
+                idf = self._idf(feature)
+                for key in self._postings.get(feature, ()):
+                    dots[key] = dots.get(key, 0.0) + weight * (1.0 + math.log(self._docs[key][0][feature])) * idf
+            dots.pop(exclude_key, None)
+
+            results = []
+            for key, dot in dots.items():
+                record = self._docs[key][1]
+                doc_norm = self._doc_norm(key)
+                score = dot / (query_norm * doc_norm) if doc_norm else 0.0
+                if score >= min_score:
+                    results.append((score, key, record))
+        results.sort(key=lambda item: item[0], reverse=True)
+        return results[:top_k]
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._docs), 'features': len(self._postings), 'loaded': self._loaded}
+
+
+claim_index = ClaimIndex()
@@ -0,0 +1,94 @@
+"""LLM 호출 전 프롬프트 압축 (추출 요약 방식).
+
+원본 기사 본문을 문장 단위로 나눈 뒤, 검색 결과 요약/키워드와 많이 겹치는 문장만
+토큰 예산 안에서 남기고(원래 순서 유지), 검색 결과는 짧은 텍스트로 직렬화합니다.
+"""
+import math
+import os
+import re
+from urllib.parse import urlparse
+
+# 한국어 기준 대략적인 글자/토큰 비율 (Gemini 토크나이저 실측치에 가까운 보수적 값)
+CHARS_PER_TOKEN = float(os.environ.get("PROMPT_CHARS_PER_TOKEN", "2.0"))
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?。])\s+|\n+')
+_WORD = re.compile(r'\w+')
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT.split(text) if sentence and sentence.strip()]
+
+
+def _bigrams(text):
+    # 조사가 붙은 한국어 단어도 겹침을 잡을 수 있도록 단어 내부 글자 bigram 사용
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        if len(word) == 1:
+            grams.add(word)
+        grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def rank_sentences(sentences, references, keywords):
+    """(점수, 인덱스) 목록을 점수 높은 순으로 반환합니다. 키워드 겹침은 2배 가중."""
+    reference_grams = _bigrams(" ".join(references))
+    keyword_grams = _bigrams(" ".join(keywords))
+    ranked = []
+    for idx, sentence in enumerate(sentences):
+        grams = _bigrams(sentence)
+        if not grams:
+            continue
+        overlap = len(grams & reference_grams) + 2 * len(grams & keyword_grams)
+        ranked.append((overlap / math.sqrt(len(grams)), idx))
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return ranked
+
+
+def compress_text(text, references, keywords, budget_tokens):
+    """관련도 높은 문장을 budget_tokens 안에서 골라 원래 순서대로 이어 붙입니다."""
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    sentences = split_sentences(text)
+    # 리드 문장은 기사 요지를 담는 경우가 많아 항상 포함
+    selected, used = {0}, estimate_tokens(sentences[0]) if sentences else 0
+    for _, idx in rank_sentences(sentences, references, keywords):
+        if idx in selected:
+            continue
+        cost = estimate_tokens(sentences[idx])
+        if used + cost > budget_tokens:
+            continue
+        selected.add(idx)
+        used += cost
+    return " ".join(sentences[idx] for idx in sorted(selected))
+
+
+def serialize_sources(article_result):
+    """검색 결과 dict 목록을 프롬프트용 짧은 텍스트로 만듭니다."""
+    lines = []
+    for idx, article in enumerate(article_result, 1):
+        domain = urlparse(article.get('source_url', '')).netloc
+        lines.append(f"[{idx}] {article.get('title', '')} ({domain}): {article.get('summary', '')}")
+    return "\n".join(lines)
+
+
+def compress_draft_inputs(title, text, article_result, keywords, budget_tokens):
+    """generate_draft 입력을 압축하고 (본문, 검색 결과 텍스트, 절감 보고서)를 반환합니다."""
+    references = [article.get('summary', '') for article in article_result] + [title]
+    compressed_text = compress_text(text, references, keywords, budget_tokens)
+    sources = serialize_sources(article_result)
+
+    original_tokens = estimate_tokens(text) + estimate_tokens(repr(article_result))
+    compressed_tokens = estimate_tokens(compressed_text) + estimate_tokens(sources)
+    report = {
+        'original_tokens': original_tokens,
+        'compressed_tokens': compressed_tokens,
+        'saved_tokens': original_tokens - compressed_tokens,
+        'saved_ratio': (original_tokens - compressed_tokens) / original_tokens if original_tokens else 0.0,
+        'kept_sentences': len(split_sentences(compressed_text)),
+        'total_sentences': len(split_sentences(text)),
+    }
+    return compressed_text, sources, report
@@ -0,0 +1,91 @@
+"""fact-check 1회 실행의 전체 마감 시간(deadline)과 노드별 남은 시간.
+
+run_graph에 마감 시간을 주면 실행 전체가 공유하는 Deadline을 contextvar에 두고,
+각 노드는 시작할 때 "뒤 단계 몫으로 남겨 둘 비율"을 뺀 만큼을 자기 예산으로 받습니다.
+예산이 끝나 생략한 작업은 degrade()로 기록하고, 결과에 degraded 플래그로 표시합니다.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import registry
+
+_current_deadline = contextvars.ContextVar("fakenews_deadline", default=None)
+_node_expires_at = contextvars.ContextVar("fakenews_node_expires_at", default=None)
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._lock = threading.Lock()
+        self.reasons = []
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def node_expires_at(self, reserve_fraction):
+        """전체 시간 중 reserve_fraction만큼은 뒤 단계를 위해 남겨 둔 노드 마감 시각."""
+        return max(time.monotonic(), self.expires_at - reserve_fraction * self.seconds)
+
+    def degrade(self, reason):
+        with self._lock:
+            if reason not in self.reasons:
+                self.reasons.append(reason)
+
+    @property
+    def degraded(self):
+        return bool(self.reasons)
+
+
+def current_deadline():
+    """현재 실행의 Deadline (마감 시간이 없으면 None)."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def run_deadline(seconds):
+    """seconds초 마감 시간으로 실행 범위를 엽니다. seconds가 없거나 0이면 제한 없음(None)."""
+    if not seconds:
+        yield None
+        return
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+        if deadline.degraded:
+            registry.inc("fakenews_degraded_runs_total")
+
+
+@contextmanager
+def node_budget(reserve_fraction=0.0):
+    """노드 하나의 예산 범위. 안쪽에서 node_remaining()으로 남은 시간을 확인합니다."""
+    deadline = current_deadline()
+    if deadline is None:
+        yield
+        return
+    token = _node_expires_at.set(deadline.node_expires_at(reserve_fraction))
+    try:
+        yield
+    finally:
+        _node_expires_at.reset(token)
+
+
+def node_remaining():
+    """현재 노드에 남은 시간(초). 마감 시간이 없으면 None."""
+    expires_at = _node_expires_at.get()
+    if expires_at is None:
+        deadline = current_deadline()
+        return None if deadline is None else deadline.remaining()
+    return max(0.0, expires_at - time.monotonic())
+
+
+def degrade(reason):
+    """예산 부족으로 일부 작업을 생략했음을 기록합니다 (마감 시간이 없으면 무시)."""
+    deadline = current_deadline()
+    if deadline is not None:
+        print(f"...⏱️ 시간 예산 부족: {reason}")
+        deadline.degrade(reason)
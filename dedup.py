@@ -0,0 +1,75 @@
+"""SimHash 기반 유사 중복 기사 탐지.
+
+통신사 기사를 그대로 옮긴 전재 기사나 입력 기사 자체가 검색 결과에 섞이면
+같은 내용을 여러 번 요약하게 되므로, 본문 지문(64비트 SimHash)을 비교해 걸러냅니다.
+"""
+import hashlib
+import os
+import re
+from collections import Counter
+
+from extractors import _COPYRIGHT_LINE
+
+# 해밍 거리가 이 값 이하인 본문은 같은 기사로 간주 (64비트 기준, 바이라인/저작권 줄을 지운 본문 기준)
+DEDUP_HAMMING_THRESHOLD = int(os.environ.get("DEDUP_HAMMING_THRESHOLD", "5"))
+
+_WORD = re.compile(r'\w+')
+_BITS = 64
+_COPYRIGHT = re.compile(_COPYRIGHT_LINE, re.IGNORECASE)
+# 전재 기사마다 달라지는 부분: "(서울=연합뉴스)", "[뉴스1]" 같은 발신지, "홍길동 기자 =" 바이라인, 기자 이메일
+# (바이라인은 "=" 형식이거나 줄/발신지 바로 뒤에 단독으로 올 때만 지움: "현장 기자들에게", "사진기자 협회"는 남김)
+_BYLINE = re.compile(
+    r'[\[(<][^\])>\n]{0,30}=[^\])>\n]{0,20}[\])>]'
+    r'|^\s*[\[(<][^\])>\n]{1,20}[\])>]'
+    r'|\S{2,4}[ \t]*(?:기자|특파원|통신원)[ \t]*='
+    r'|(?:^|(?<=[\])>]))[ \t]*\S{2,4}[ \t]*(?:기자|특파원|통신원)(?=[ \t]*(?:$|[\w.+-]+@))'
+    r'|[\w.+-]+@[\w-]+\.[\w.]+',
+    re.MULTILINE,
+)
+
+
+def strip_boilerplate(text):
+    """저작권 줄을 빼고 발신지/바이라인/이메일을 지운 본문 (언론사마다 다른 부분만 제거)."""
+    lines = (line for line in text.splitlines() if not _COPYRIGHT.search(line))
+    return _BYLINE.sub(" ", "\n".join(lines))
+
+
+def _shingles(text):
+    # 단어 2-gram (일부 문장만 다른 전재 기사도 지문이 가깝게 나오도록)
+    words = _WORD.findall(strip_boilerplate(text).lower())
+    if len(words) < 2:
+        return Counter(words)
+    return Counter(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def simhash(text):
+    """본문의 64비트 SimHash 지문을 반환합니다."""
+    weights = [0] * _BITS
+    for feature, count in _shingles(text).items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateFilter:
+    """지금까지 본 본문 지문과 비교해 유사 중복 여부를 판단합니다."""
+
+    def __init__(self, threshold=DEDUP_HAMMING_THRESHOLD):
+        self.threshold = threshold
+        self.fingerprints = []
+
+    def add(self, text):
+        self.fingerprints.append(simhash(text))
+
+    def is_duplicate(self, text):
+        """text가 이미 본 본문과 유사하면 True, 아니면 지문을 기억하고 False."""
+        fingerprint = simhash(text)
+        if any(hamming_distance(fingerprint, seen) <= self.threshold for seen in self.fingerprints):
+            return True
+        self.fingerprints.append(fingerprint)
+        return False
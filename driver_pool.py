@@ -0,0 +1,299 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# --- 드라이버 풀 설정 (환경 변수로 조정 가능) ---
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_PAGES = int(os.environ.get("DRIVER_MAX_PAGES", "50"))
+DRIVER_CHECKOUT_TIMEOUT = float(os.environ.get("DRIVER_CHECKOUT_TIMEOUT", "60"))
+DRIVER_WARM_ON_START = os.environ.get("DRIVER_WARM_ON_START", "0") == "1"
+
+# --- 빠른 브라우징 프로필 ---
+# 기사 추출에는 <head>의 메타 태그와 본문 컨테이너만 필요하므로 이미지/미디어/폰트/스타일시트와
+# 광고·트래커 요청을 막고, DOMContentLoaded(eager)에서 로드 대기를 끝냄
+SELENIUM_FAST_PROFILE = os.environ.get("SELENIUM_FAST_PROFILE", "1") == "1"
+# normal / eager / none (빠른 프로필에서만 적용)
+SELENIUM_PAGE_LOAD_STRATEGY = os.environ.get("SELENIUM_PAGE_LOAD_STRATEGY", "eager")
+# 페이지 하나의 최대 로드 시간(초). 넘으면 로드를 멈추고 그때까지 받은 DOM을 사용
+SELENIUM_PAGE_LOAD_TIMEOUT = float(os.environ.get("SELENIUM_PAGE_LOAD_TIMEOUT", "15"))
+# 로드 후(driver.get() 반환 뒤) 본문 대기 중에 적용하는 전송량 한도(바이트). driver.get() 동안 받는
+# 양은 막지 못하므로(그 구간은 SELENIUM_PAGE_LOAD_TIMEOUT이 제한), 넘으면 본문을 더 기다리지 않고
+# 남은 로드를 멈추는 용도
+SELENIUM_MAX_PAGE_BYTES = int(os.environ.get("SELENIUM_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+# 페이지별 요청 수/전송량/CPU 시간 집계 (네트워크 이벤트 로그를 켜야 해서 기본은 빠른 프로필일 때만).
+# 끄면 SELENIUM_MAX_PAGE_BYTES 한도도 적용되지 않음
+SELENIUM_PAGE_STATS = os.environ.get("SELENIUM_PAGE_STATS", "1" if SELENIUM_FAST_PROFILE else "0") == "1"
+
+BLOCKED_RESOURCE_PATTERNS = {
+    'image': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif"],
+    'media': ["*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.ogg"],
+    'font': ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    'stylesheet': ["*.css"],
+}
+SELENIUM_BLOCK_RESOURCES = [kind.strip() for kind in os.environ.get(
+    "SELENIUM_BLOCK_RESOURCES", ",".join(BLOCKED_RESOURCE_PATTERNS)).split(",") if kind.strip()]
+# 광고/트래커 호스트 (SELENIUM_BLOCKED_HOSTS로 쉼표 구분해 추가)
+BLOCKED_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com", "adnxs.com",
+    "dable.io", "mobon.net", "realssp.co.kr", "tenping.kr", "acrosspf.com", "wcs.naver.net", "kakaoad.com",
+    "youtube.com/embed", "player.vimeo.com",
+] + [host.strip() for host in os.environ.get("SELENIUM_BLOCKED_HOSTS", "").split(",") if host.strip()]
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """크롬 드라이버 바이너리 경로를 프로세스당 한 번만 확인합니다."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+    return _driver_path
+
+
+# selenium / webdriver_manager는 임포트 비용이 커서 드라이버를 실제로 만들 때 불러옴
+def build_chrome_options():
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if SELENIUM_PAGE_STATS:
+        # 페이지별 전송량 집계용 네트워크 이벤트 로그 (drain_page_stats)
+        chrome_options.set_capability("goog:loggingPrefs", {'performance': 'ALL'})
+    if SELENIUM_FAST_PROFILE:
+        chrome_options.page_load_strategy = SELENIUM_PAGE_LOAD_STRATEGY
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+        if 'image' in SELENIUM_BLOCK_RESOURCES:
+            chrome_options.add_experimental_option("prefs", {'profile.managed_default_content_settings.images': 2})
+    return chrome_options
+
+
+def blocked_url_patterns():
+    """Network.setBlockedURLs 패턴. 패턴은 URL 전체와 비교되므로 확장자 패턴마다 쿼리 문자열이 붙은
+    형태(예: style.css?v=3)도 함께 넣음 ("*.css*"로 넓히면 "*.ts*"가 다른 URL까지 막을 수 있음)."""
+    patterns = []
+    for kind in SELENIUM_BLOCK_RESOURCES:
+        for pattern in BLOCKED_RESOURCE_PATTERNS.get(kind, ()):
+            patterns += [pattern, f"{pattern}?*"]
+    return patterns + [f"*{host}*" for host in BLOCKED_HOSTS]
+
+
+def _origin_of(url):
+    """http(s) URL의 출처(scheme://host[:port]). about:blank, data: 등은 None."""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def configure_driver(driver):
+    """페이지 로드 제한 시간과 성능 측정을 설정하고, 빠른 프로필이면 무거운 리소스와 광고/트래커 요청을 CDP로 차단합니다."""
+    driver.set_page_load_timeout(SELENIUM_PAGE_LOAD_TIMEOUT)
+    if SELENIUM_PAGE_STATS:
+        # CPU 시간/JS 힙 사용량 측정 (performance_metrics)
+        driver.execute_cdp_cmd("Performance.enable", {})
+    if SELENIUM_FAST_PROFILE:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {'urls': blocked_url_patterns()})
+
+
+def performance_metrics(driver):
+    """CDP Performance 지표 중 누적 작업 시간(초)과 JS 힙 사용량(바이트)."""
+    if not SELENIUM_PAGE_STATS:
+        return {}
+    try:
+        metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})['metrics']}
+    except Exception:
+        return {}
+    return {'task_seconds': metrics.get('TaskDuration', 0.0), 'js_heap_bytes': int(metrics.get('JSHeapUsedSize', 0))}
+
+
+def drain_page_stats(driver, stats=None):
+    """지난 호출 이후 쌓인 네트워크 로그로 요청 수, 전송 바이트, 차단된 요청 수를 누적합니다."""
+    stats = stats if stats is not None else {'requests': 0, 'bytes': 0, 'blocked': 0}
+    if not SELENIUM_PAGE_STATS:
+        return stats
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return stats
+    for entry in entries:
+        message = json.loads(entry['message'])['message']
+        method = message.get('method')
+        if method == 'Network.requestWillBeSent':
+            stats['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            stats['bytes'] += int(message['params'].get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+            stats['blocked'] += 1
+    return stats
+
+
+class PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """미리 띄워 둔 headless 크롬 드라이버를 빌려 주고 돌려받는 풀."""
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        # 최근에 반납된(=가장 따뜻한) 드라이버부터 재사용
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {'created': 0, 'reused': 0, 'recycled': 0, 'unhealthy': 0}
+
+    def _create(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        driver = webdriver.Chrome(service=ChromeService(resolve_driver_path()), options=build_chrome_options())
+        try:
+            configure_driver(driver)
+        except Exception as e:
+            print(f"...빠른 브라우징 프로필 적용 실패 (기본 설정으로 사용): {e}")
+        with self._lock:
+            self._stats['created'] += 1
+        return PooledDriver(driver)
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"...크롬 드라이버 종료 중 에러 발생: {e}")
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _reset(self, pooled):
+        """다음 사용자를 위해 쿠키/스토리지를 비우고 빈 페이지로 이동합니다."""
+        driver = pooled.driver
+        try:
+            driver.execute_script("window.sessionStorage.clear();")
+        except Exception as e:
+            print(f"...세션 스토리지 초기화 실패: {e}")
+        # delete_all_cookies()는 현재 도메인의 쿠키만 지우므로 CDP로 브라우저 전체 쿠키를 비움.
+        # 실패하면 예외를 그대로 올려 release()에서 드라이버를 폐기하도록 함
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        origin = _origin_of(driver.current_url)
+        if origin:
+            # 로컬 스토리지/IndexedDB/서비스 워커 등은 출처(origin) 단위로만 지울 수 있음
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {'origin': origin, 'storageTypes': 'all'})
+        driver.get("about:blank")
+        # 다음 페이지의 전송량 집계에 섞이지 않도록 남은 네트워크 로그를 비움
+        drain_page_stats(driver)
+
+    def acquire(self, timeout=DRIVER_CHECKOUT_TIMEOUT):
+        if self._closed:
+            raise RuntimeError("드라이버 풀이 이미 종료되었습니다.")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"{timeout}초 안에 사용 가능한 크롬 드라이버가 없습니다.")
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+                if self._is_healthy(pooled):
+                    with self._lock:
+                        self._stats['reused'] += 1
+                    return pooled
+                with self._lock:
+                    self._stats['unhealthy'] += 1
+                self._quit(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled):
+        try:
+            pooled.pages += 1
+            if self._closed or pooled.pages >= self.max_pages:
+                if not self._closed:
+                    with self._lock:
+                        self._stats['recycled'] += 1
+                self._quit(pooled)
+                return
+            try:
+                self._reset(pooled)
+            except Exception as e:
+                print(f"...크롬 드라이버 상태 초기화 실패, 폐기합니다: {e}")
+                with self._lock:
+                    self._stats['unhealthy'] += 1
+                self._quit(pooled)
+                return
+            self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=DRIVER_CHECKOUT_TIMEOUT):
+        pooled = self.acquire(timeout=timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self.release(pooled)
+
+    def warm(self, count=None):
+        """풀 크기만큼 드라이버를 미리 띄워 둡니다."""
+        borrowed = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                borrowed.append(self.acquire())
+        finally:
+            for pooled in borrowed:
+                # 워밍업은 페이지 사용으로 집계하지 않음
+                pooled.pages -= 1
+                self.release(pooled)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=self.size, idle=self._idle.qsize())
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(pooled)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """프로세스 전역에서 공유하는 드라이버 풀을 반환합니다."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+            if DRIVER_WARM_ON_START:
+                _pool.warm()
+    return _pool
@@ -0,0 +1,238 @@
+"""언론사 도메인별 본문 추출기 레지스트리.
+
+도메인(urlparse의 netloc)마다 미리 컴파일한 XPath와 후처리 규칙을 등록해 두고,
+해당 도메인 추출기 → 일반 추출기(측정된 적중률 순) 순서로 시도합니다.
+새 언론사는 register_extractor()나 FAKENEWS_EXTRACTORS(JSON 파일)로 추가합니다.
+"""
+import json
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+# lxml은 처음 추출할 때 불러옴 (임포트 시간 단축)
+
+# 추가 추출기 설정 파일 경로 (JSON 목록, 형식은 load_extractors_file 참고)
+EXTRACTORS_CONFIG = os.environ.get("FAKENEWS_EXTRACTORS")
+
+TITLE_XPATH = "//meta[@property='og:title']/@content"
+
+
+def element_text(element):
+    """본문 요소에서 스크립트/스타일을 제거하고 줄 단위로 정리한 텍스트를 반환합니다."""
+    for bad in element.xpath('.//script|.//style|.//noscript'):
+        bad.drop_tree()
+    for br in element.xpath('.//br'):
+        br.tail = "\n" + (br.tail or "")
+    lines = [" ".join(line.split()) for line in element.text_content().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+class Extractor:
+    """본문 XPath 목록과 후처리 규칙(제거할 하위 요소, 지울 줄 패턴)을 가진 추출기."""
+
+    def __init__(self, name, body_xpaths, drop_xpaths=(), strip_patterns=(), title_xpath=TITLE_XPATH):
+        self.name = name
+        self.body_xpaths = list(body_xpaths)
+        self.drop_xpaths = list(drop_xpaths)
+        self.strip_patterns = [re.compile(pattern) for pattern in strip_patterns]
+        self.title_xpath = title_xpath
+        self._compiled = None
+        self._compile_lock = threading.Lock()
+
+    def _compile(self):
+        with self._compile_lock:
+            if self._compiled is None:
+                from lxml import etree
+                self._compiled = (
+                    [etree.XPath(xpath) for xpath in self.body_xpaths],
+                    etree.XPath("|".join(self.drop_xpaths)) if self.drop_xpaths else None,
+                    etree.XPath(self.title_xpath),
+                )
+        return self._compiled
+
+    def title(self, doc):
+        titles = self._compile()[2](doc)
+        return titles[0].strip() if titles else ""
+
+    def extract(self, doc):
+        """본문 텍스트를 반환합니다. 컨테이너가 없으면 None."""
+        body_xpaths, drop_xpath, _ = self._compile()
+        for xpath in body_xpaths:
+            found = xpath(doc)
+            if not found:
+                continue
+            element = found[0]
+            if drop_xpath is not None:
+                for bad in drop_xpath(element):
+                    bad.drop_tree()
+            text = element_text(element)
+            if self.strip_patterns:
+                text = "\n".join(
+                    line for line in text.splitlines()
+                    if not any(pattern.search(line) for pattern in self.strip_patterns)
+                )
+            return text
+        return None
+
+
+class ExtractorRegistry:
+    """도메인별 추출기와 일반 추출기를 관리하고 도메인별 성공률/소요 시간을 집계합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_domain = {}
+        self._generic = []
+        self._extractor_stats = {}
+        self._domain_stats = {}
+
+    def register(self, domains, extractor):
+        with self._lock:
+            for domain in domains:
+                self._by_domain.setdefault(domain.lower(), []).append(extractor)
+
+    def register_generic(self, extractor):
+        with self._lock:
+            self._generic.append(extractor)
+
+    @staticmethod
+    def domain_of(url):
+        return (urlparse(url).hostname or "").lower()
+
+    def _hit_rate(self, extractor):
+        stats = self._extractor_stats.get(extractor.name, {'hits': 0, 'attempts': 0})
+        # 아직 시도하지 않은 추출기가 뒤로 밀리지 않도록 (hits+1)/(attempts+2)로 보정
+        return (stats['hits'] + 1) / (stats['attempts'] + 2)
+
+    def candidates(self, url):
+        """가장 구체적으로 일치하는 도메인의 전용 추출기 다음, 적중률 순 일반 추출기."""
+        parts = self.domain_of(url).split('.')
+        with self._lock:
+            specific = []
+            for idx in range(len(parts) - 1):
+                specific = self._by_domain.get('.'.join(parts[idx:]), [])
+                if specific:
+                    break
+            generic = sorted(self._generic, key=self._hit_rate, reverse=True)
+        return specific + [extractor for extractor in generic if extractor not in specific]
+
+    def body_xpaths(self, url):
+        """url에 시도할 본문 컨테이너 XPath를 우선순위대로 반환합니다 (브라우저에서 로드 완료 판단용)."""
+        xpaths = []
+        for extractor in self.candidates(url):
+            xpaths.extend(xpath for xpath in extractor.body_xpaths if xpath not in xpaths)
+        return xpaths
+
+    def _record(self, extractor, hit):
+        with self._lock:
+            stats = self._extractor_stats.setdefault(extractor.name, {'hits': 0, 'attempts': 0})
+            stats['attempts'] += 1
+            stats['hits'] += hit
+
+    def record_domain(self, domain, container, seconds):
+        """도메인별 추출 결과를 기록합니다. container가 None이면 실패."""
+        with self._lock:
+            stats = self._domain_stats.setdefault(
+                domain, {'count': 0, 'succeeded': 0, 'total_seconds': 0.0, 'containers': {}}
+            )
+            stats['count'] += 1
+            stats['succeeded'] += container is not None
+            stats['total_seconds'] += seconds
+            if container is not None:
+                stats['containers'][container] = stats['containers'].get(container, 0) + 1
+
+    def extract(self, url, doc):
+        """(제목, 본문, 추출기 이름)을 반환합니다. 어떤 추출기도 맞지 않으면 본문/이름이 None."""
+        candidates = self.candidates(url)
+        title = candidates[0].title(doc) if candidates else ""
+        for extractor in candidates:
+            text = extractor.extract(doc)
+            self._record(extractor, text is not None)
+            if text is not None:
+                return title, text, extractor.name
+        return title, None, None
+
+    def stats(self):
+        """도메인별 성공률/평균 소요 시간과 추출기별 적중률을 반환합니다."""
+        with self._lock:
+            domains = {
+                domain: {
+                    'count': s['count'],
+                    'success_rate': s['succeeded'] / s['count'] if s['count'] else 0.0,
+                    'avg_seconds': s['total_seconds'] / s['count'] if s['count'] else 0.0,
+                    'containers': dict(s['containers']),
+                }
+                for domain, s in self._domain_stats.items()
+            }
+            extractors = {
+                name: {**s, 'hit_rate': s['hits'] / s['attempts'] if s['attempts'] else 0.0}
+                for name, s in self._extractor_stats.items()
+            }
+        return {'domains': domains, 'extractors': extractors}
+
+
+registry = ExtractorRegistry()
+
+
+def register_extractor(domains, name, body_xpaths, drop_xpaths=(), strip_patterns=(), title_xpath=TITLE_XPATH):
+    """새 언론사 추출기를 등록합니다. domains가 비어 있으면 일반 추출기로 등록합니다."""
+    extractor = Extractor(name, body_xpaths, drop_xpaths, strip_patterns, title_xpath)
+    if domains:
+        registry.register(domains, extractor)
+    else:
+        registry.register_generic(extractor)
+    return extractor
+
+
+def load_extractors_file(path):
+    """JSON 목록의 각 항목을 추출기로 등록합니다.
+
+    예: [{"domains": ["example.co.kr"], "name": "example", "body_xpaths": ["//div[@id='news_body']"],
+          "drop_xpaths": [".//figure"], "strip_patterns": ["무단 전재"]}]
+    """
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    for entry in entries:
+        register_extractor(
+            entry.get('domains', []), entry['name'], entry['body_xpaths'],
+            entry.get('drop_xpaths', ()), entry.get('strip_patterns', ()), entry.get('title_xpath', TITLE_XPATH),
+        )
+
+
+# 기사 끝의 저작권 안내 줄
+_COPYRIGHT_LINE = r"(무단\s*전재|재배포\s*금지|Copyright|ⓒ|©)"
+
+# --- 언론사별 추출기 ---
+register_extractor(
+    ['news.naver.com', 'n.news.naver.com', 'entertain.naver.com', 'sports.news.naver.com'],
+    'naver',
+    ["//*[@id='dic_area']", "//*[@id='articleBodyContents']", "//*[@id='articeBody']", "//*[@id='newsEndContents']"],
+    drop_xpaths=[".//*[contains(@class, 'end_photo_org')]", ".//*[contains(@class, 'media_end_summary')]"],
+    strip_patterns=[_COPYRIGHT_LINE],
+)
+register_extractor(
+    ['v.daum.net', 'news.daum.net'],
+    'daum',
+    ["//*[@id='dic_area']", "//*[contains(@class, 'article_view')]"],
+    drop_xpaths=[".//figure", ".//*[contains(@class, 'txt_caption')]"],
+    strip_patterns=[_COPYRIGHT_LINE],
+)
+register_extractor(
+    ['news.nate.com', 'm.news.nate.com'],
+    'nate',
+    ["//*[@id='article_body']", "//*[@id='realArtcContents']"],
+    strip_patterns=[_COPYRIGHT_LINE],
+)
+
+# --- 일반 추출기 (도메인 전용 추출기가 없거나 실패했을 때, 적중률 순으로 시도) ---
+register_extractor([], '#articleBodyContents', ["//*[@id='articleBodyContents']"])
+register_extractor([], '#dic_area', ["//*[@id='dic_area']"])
+register_extractor([], '#article_body', ["//*[@id='article_body']"])
+register_extractor([], 'itemprop=articleBody', ["//*[@itemprop='articleBody']"])
+
+if EXTRACTORS_CONFIG:
+    load_extractors_file(EXTRACTORS_CONFIG)
+
+
+def get_extractor_stats():
+    return registry.stats()
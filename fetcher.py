@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from driver_pool import (get_driver_pool, drain_page_stats, performance_metrics, DRIVER_CHECKOUT_TIMEOUT,
+                         SELENIUM_MAX_PAGE_BYTES, SELENIUM_PAGE_LOAD_TIMEOUT, USER_AGENT)
+from extractors import registry as extractor_registry
+from metrics import record_page_load
+
+# lxml / newspaper / selenium은 처음 기사를 추출할 때 불러옴 (임포트 시간 단축)
+
+# --- HTTP 우선 추출 설정 ---
+HTTP_TIMEOUT = float(os.environ.get("HTTP_FETCH_TIMEOUT", "8"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+# 페이지 로드 후 제목(og:title)과 본문 컨테이너가 나타나기를 기다리는 최대 시간 (초)
+SELENIUM_WAIT_TIMEOUT = 10
+SELENIUM_POLL_INTERVAL = 0.1
+# 남은 시간이 이보다 적으면 Selenium 폴백을 시작하지 않음
+SELENIUM_MIN_BUDGET = 2.0
+
+_session = None
+_session_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_tier_stats = {
+    'http': {'count': 0, 'total_seconds': 0.0, 'bytes': 0, 'requests': 0, 'blocked': 0},
+    'selenium': {'count': 0, 'total_seconds': 0.0, 'bytes': 0, 'requests': 0, 'blocked': 0},
+    'failed': {'count': 0, 'total_seconds': 0.0, 'bytes': 0, 'requests': 0, 'blocked': 0},
+}
+
+# 제목이 있고, 알려진 본문 컨테이너가 나타났거나 (컨테이너를 모르는 페이지는) 로드가 끝났으면 준비 완료
+_ARTICLE_READY_JS = """
+if (!document.querySelector("meta[property='og:title']")) return false;
+for (const xpath of arguments[0]) {
+    try {
+        if (document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) return true;
+    } catch (e) {}
+}
+return document.readyState === 'complete';
+"""
+_HAS_TITLE_JS = "return !!document.querySelector(\"meta[property='og:title']\");"
+
+
+def get_http_session():
+    """keep-alive 커넥션을 재사용하는 공유 requests.Session을 반환합니다."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+            })
+            # SSL 인증서 검증 오류 우회 (agent.py의 requests 설정과 동일한 정책)
+            session.verify = False
+            _session = session
+    return _session
+
+
+def _record_tier(tier, seconds, page_stats=None):
+    with _stats_lock:
+        stats = _tier_stats[tier]
+        stats['count'] += 1
+        stats['total_seconds'] += seconds
+        for key in ('bytes', 'requests', 'blocked'):
+            stats[key] += (page_stats or {}).get(key, 0)
+
+
+def get_fetch_stats():
+    """tier별 성공 횟수, 평균 소요 시간, 페이지당 평균 전송량/요청 수/차단 수를 반환합니다
+    (도메인별 통계는 extractors.get_extractor_stats)."""
+    with _stats_lock:
+        total = sum(s['count'] for s in _tier_stats.values())
+        return {
+            tier: {
+                'count': s['count'],
+                'hit_rate': s['count'] / total if total else 0.0,
+                'avg_seconds': s['total_seconds'] / s['count'] if s['count'] else 0.0,
+                'avg_bytes': s['bytes'] / s['count'] if s['count'] else 0.0,
+                'avg_requests': s['requests'] / s['count'] if s['count'] else 0.0,
+                'avg_blocked': s['blocked'] / s['count'] if s['count'] else 0.0,
+            }
+            for tier, s in _tier_stats.items()
+        }
+
+
+def parse_article_html(url, page_html):
+    """HTML에서 og:title과 본문을 추출합니다. 도메인별 추출기 레지스트리(extractors.py)를
+    먼저 시도하고, 맞는 컨테이너가 없으면 Newspaper3k로 파싱합니다."""
+    from lxml import html as lxml_html
+    from newspaper import Article
+
+    start = time.perf_counter()
+    domain = extractor_registry.domain_of(url)
+    doc = lxml_html.fromstring(page_html)
+    title, text, container = extractor_registry.extract(url, doc)
+
+    if text is None:
+        article = Article(url)
+        article.set_html(page_html if isinstance(page_html, str) else lxml_html.tostring(doc, encoding='unicode'))
+        article.parse()
+        text, container = article.text, 'newspaper3k'
+
+    extractor_registry.record_domain(domain, container if text else None, time.perf_counter() - start)
+    return {'title': title, 'text': text, 'container': container}
+
+
+def fetch_with_http(url, timeout=HTTP_TIMEOUT):
+    resp = get_http_session().get(url, timeout=timeout)
+    resp.raise_for_status()
+    content_type = resp.headers.get('Content-Type', '')
+    if 'html' not in content_type:
+        raise ValueError(f"HTML 문서가 아닙니다: {content_type}")
+    # 헤더에 charset이 없으면 lxml이 <meta charset>을 보고 직접 디코딩하도록 바이트를 넘김
+    page_html = resp.text if 'charset' in content_type.lower() else resp.content
+    result = parse_article_html(url, page_html)
+    result['page_stats'] = {'requests': 1, 'bytes': len(resp.content), 'blocked': 0}
+    return result
+
+
+def _wait_for_article(driver, url, wait_timeout, page_stats):
+    """제목과 본문 컨테이너가 나타나면 바로 반환합니다. 전송량 한도나 대기 시간을 넘기면 로드를 멈추고
+    그때까지의 DOM을 사용하며, 제목조차 없으면 TimeoutError를 던집니다.
+
+    전송량 한도(SELENIUM_MAX_PAGE_BYTES)는 driver.get()이 반환된 뒤에만 확인하는 사후 한도입니다.
+    """
+    xpaths = extractor_registry.body_xpaths(url)
+    expires_at = time.monotonic() + wait_timeout
+    while True:
+        drain_page_stats(driver, page_stats)
+        if driver.execute_script(_ARTICLE_READY_JS, xpaths):
+            return
+        if page_stats['bytes'] > SELENIUM_MAX_PAGE_BYTES:
+            print(f"    - [{url}] 전송량 한도({SELENIUM_MAX_PAGE_BYTES} bytes) 초과. 로드를 멈추고 추출합니다.")
+            break
+        if time.monotonic() >= expires_at:
+            break
+        time.sleep(SELENIUM_POLL_INTERVAL)
+    driver.execute_script("window.stop();")
+    if not driver.execute_script(_HAS_TITLE_JS):
+        raise TimeoutError(f"{wait_timeout:.1f}초 안에 og:title이 나타나지 않았습니다.")
+
+
+def fetch_with_selenium(url, timeout=None):
+    """브라우저로 렌더링해 추출합니다. 결과의 'page_stats'에 요청 수, 전송 바이트, 차단된 요청 수,
+    로드 시간, 브라우저 작업(CPU) 시간, JS 힙 사용량을 담습니다.
+
+    timeout(초)이 주어지면 드라이버 대기, 페이지 로드, 본문 대기를 모두 그 안에서 끝냅니다.
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    expires_at = None if timeout is None else time.monotonic() + timeout
+    checkout_timeout = DRIVER_CHECKOUT_TIMEOUT if timeout is None else min(DRIVER_CHECKOUT_TIMEOUT, timeout)
+    with get_driver_pool().driver(timeout=checkout_timeout) as driver:
+        if expires_at is not None:
+            driver.set_page_load_timeout(max(1, int(min(SELENIUM_PAGE_LOAD_TIMEOUT, expires_at - time.monotonic()))))
+        try:
+            before = performance_metrics(driver)
+            page_stats = {'requests': 0, 'bytes': 0, 'blocked': 0}
+            start = time.perf_counter()
+            try:
+                driver.get(url)
+            except TimeoutException:
+                # 로드 시간 한도 초과: 남은 리소스는 버리고 지금까지 만들어진 DOM에서 추출
+                print(f"    - [{url}] 페이지 로드 시간 한도 초과. 로드를 멈추고 추출합니다.")
+                driver.execute_script("window.stop();")
+            wait_timeout = SELENIUM_WAIT_TIMEOUT
+            if expires_at is not None:
+                wait_timeout = min(wait_timeout, max(0.5, expires_at - time.monotonic()))
+            _wait_for_article(driver, url, wait_timeout, page_stats)
+            page_stats['load_seconds'] = time.perf_counter() - start
+            # 요소마다 find_element로 찾지 않고 렌더링된 HTML을 한 번 받아 HTTP 경로와 같은 추출기로 파싱
+            page_html = driver.page_source
+            after = performance_metrics(driver)
+            if after:
+                page_stats['task_seconds'] = after['task_seconds'] - before.get('task_seconds', 0.0)
+                page_stats['js_heap_bytes'] = after['js_heap_bytes']
+        finally:
+            if expires_at is not None:
+                driver.set_page_load_timeout(SELENIUM_PAGE_LOAD_TIMEOUT)
+    result = parse_article_html(url, page_html)
+    result['page_stats'] = page_stats
+    return result
+
+
+def fetch_article(url, min_length=30, timeout=None):
+    """HTTP로 먼저 추출하고, 제목/본문이 부족할 때만 Selenium으로 렌더링합니다.
+
+    timeout(초)이 주어지면 HTTP 요청과 Selenium 폴백을 합쳐 그 안에서 끝내고,
+    남은 시간이 부족하면 Selenium 폴백 없이 TimeoutError를 던집니다.
+    반환값의 'tier'에는 성공한 단계('http' 또는 'selenium')가 기록됩니다.
+    """
+    start = time.perf_counter()
+    http_timeout = HTTP_TIMEOUT if timeout is None else max(0.5, min(HTTP_TIMEOUT, timeout))
+    try:
+        result = fetch_with_http(url, timeout=http_timeout)
+        if result['title'] and len(result['text']) >= min_length:
+            elapsed = time.perf_counter() - start
+            _record_tier('http', elapsed, result['page_stats'])
+            record_page_load(url, 'http', elapsed, result['page_stats'])
+            result.update(tier='http', elapsed=elapsed)
+            return result
+        print(f"    - [{url}] HTTP 추출 결과 부족. Selenium 폴백 사용.")
+    except Exception as e:
+        print(f"    - [{url}] HTTP 추출 실패 ({e.__class__.__name__}). Selenium 폴백 사용.")
+
+    try:
+        remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+        if remaining is not None and remaining < SELENIUM_MIN_BUDGET:
+            raise TimeoutError(f"남은 시간({remaining:.1f}s)이 부족해 Selenium 폴백을 건너뜁니다.")
+        result = fetch_with_selenium(url, timeout=remaining)
+    except Exception:
+        elapsed = time.perf_counter() - start
+        _record_tier('failed', elapsed)
+        record_page_load(url, 'failed', elapsed)
+        raise
+    elapsed = time.perf_counter() - start
+    _record_tier('selenium', elapsed, result['page_stats'])
+    record_page_load(url, 'selenium', elapsed, result['page_stats'])
+    result.update(tier='selenium', elapsed=elapsed)
+    return result
@@ -0,0 +1,70 @@
+import hashlib
+import os
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from cache import SQLiteTTLCache
+
+# --- LLM 응답 캐시 설정 ---
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "20000"))
+# 캐시에서 꺼낸 응답의 generation_info에 붙이는 표시 (호출 지표에서 실제 Gemini 호출과 구분)
+CACHE_HIT_KEY = 'llm_cache_hit'
+
+
+class PersistentLLMCache(BaseCache):
+    """프롬프트 단위 LLM 응답 캐시 (SQLite 디스크 저장).
+
+    LangChain이 넘겨주는 llm_string에는 모델 이름과 파라미터(temperature,
+    response_mime_type 등)가 들어 있으므로, 프롬프트 메시지와 합쳐 키를 만듭니다.
+    """
+
+    def __init__(self, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self._store = SQLiteTTLCache('llm_cache', ttl=ttl, max_entries=max_entries)
+
+    @staticmethod
+    def _key(prompt, llm_string):
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode('utf-8')).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        value = self._store.get(self._key(prompt, llm_string))
+        if value is None:
+            return None
+        generations = []
+        for item in value:
+            generation_info = {**(item.get('generation_info') or {}), CACHE_HIT_KEY: True}
+            if item.get('message') is not None:
+                message = messages_from_dict([item['message']])[0]
+                generations.append(ChatGeneration(message=message, generation_info=generation_info))
+            else:
+                generations.append(Generation(text=item['text'], generation_info=generation_info))
+        return generations
+
+    def update(self, prompt, llm_string, return_val):
+        value = []
+        for generation in return_val:
+            message = getattr(generation, 'message', None)
+            generation_info = {name: info for name, info in (generation.generation_info or {}).items()
+                               if name != CACHE_HIT_KEY}
+            value.append({
+                'text': generation.text,
+                'message': message_to_dict(message) if message is not None else None,
+                'generation_info': generation_info or None,
+            })
+        try:
+            self._store.set(self._key(prompt, llm_string), value)
+        except Exception as e:
+            # 캐시 저장 실패가 LLM 호출 자체를 실패시키지 않도록 함
+            print(f"...LLM 응답 캐시 저장 실패: {e}")
+
+    def clear(self, **kwargs):
+        self._store.clear()
+
+    def stats(self):
+        return self._store.stats()
+
+
+llm_response_cache = PersistentLLMCache() if LLM_CACHE_ENABLED else None
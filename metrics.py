@@ -0,0 +1,283 @@
+"""파이프라인 실행 계측 (노드별 시간, 페이지 로드, GNews, Gemini 호출/토큰, 캐시 적중).
+
+실행 단위 지표는 RunMetrics에 모아 결과 state['metrics']에 붙이고, 프로세스 전체
+누적치는 Prometheus 텍스트 형식(render_prometheus)이나 JSON 로그로 내보냅니다.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("fakenews.metrics")
+
+# 실행 지표를 JSON 한 줄 로그로 남길지 여부
+METRICS_LOG_ENABLED = os.environ.get("METRICS_LOG", "0") == "1"
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+_current_run = contextvars.ContextVar("fakenews_run_metrics", default=None)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for idx, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[idx] += 1
+                return
+        self.counts[-1] += 1
+
+
+class _Registry:
+    """프로세스 전체 누적 지표 (Prometheus 노출용)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            self.histograms.setdefault(self._key(name, labels), _Histogram()).observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            key = self._key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self):
+        def fmt_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{fmt_labels(labels)} {value}")
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), hist in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {hist.total:.6f}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = _Registry()
+
+
+class RunMetrics:
+    """fact-check 1회 실행 동안의 계측 값."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.total_seconds = None
+        self.nodes = {}
+        self.page_loads = []
+        self.gnews_queries = []
+        self.llm = {'calls': 0, 'seconds': 0.0, 'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0}
+        self.cache = {}
+        self.prompts = {}
+        self.prescreen = {}
+
+    def record_node(self, node, seconds):
+        with self._lock:
+            # 같은 노드가 여러 번 실행될 수 있으므로 누적
+            self.nodes[node] = self.nodes.get(node, 0.0) + seconds
+        registry.observe("fakenews_node_seconds", seconds, node=node)
+
+    def record_page_load(self, url, tier, seconds, page_stats=None):
+        with self._lock:
+            self.page_loads.append({'url': url, 'tier': tier, 'seconds': seconds, **(page_stats or {})})
+
+    def record_gnews(self, query, seconds, results):
+        with self._lock:
+            self.gnews_queries.append({'query': query, 'seconds': seconds, 'results': results})
+
+    def record_llm(self, seconds, usage):
+        with self._lock:
+            self.llm['calls'] += 1
+            self.llm['seconds'] += seconds
+            for key in ('input_tokens', 'output_tokens', 'total_tokens'):
+                self.llm[key] += int(usage.get(key, 0) or 0)
+
+    def record_cache(self, cache, hit):
+        with self._lock:
+            stats = self.cache.setdefault(cache, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def record_prompt(self, stage, report):
+        with self._lock:
+            self.prompts[stage] = dict(report)
+
+    def record_prescreen(self, result):
+        with self._lock:
+            self.prescreen = {'routed': result['routed'], 'fake_probability': result['fake_probability'],
+                              'confidence': result['confidence']}
+
+    def finish(self):
+        """실행을 마무리하고 누적 지표 반영 후 dict로 반환합니다."""
+        if self.total_seconds is None:
+            self.total_seconds = time.perf_counter() - self._start
+            registry.inc("fakenews_runs_total")
+            registry.observe("fakenews_run_seconds", self.total_seconds)
+        data = self.to_dict()
+        if METRICS_LOG_ENABLED:
+            logger.info(json.dumps({'event': 'fact_check_run', **data}, ensure_ascii=False))
+        return data
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'total_seconds': self.total_seconds,
+                'nodes': dict(self.nodes),
+                'page_loads': list(self.page_loads),
+                'gnews_queries': list(self.gnews_queries),
+                'llm': dict(self.llm),
+                'cache': {name: dict(stats) for name, stats in self.cache.items()},
+                'prompts': {stage: dict(report) for stage, report in self.prompts.items()},
+                'prescreen': dict(self.prescreen),
+            }
+
+
+def current_run():
+    """현재 실행 중인 RunMetrics (없으면 None)."""
+    return _current_run.get()
+
+
+@contextmanager
+def collect_run_metrics():
+    run = RunMetrics()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def node_timer(node):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = current_run()
+        seconds = time.perf_counter() - start
+        if run is not None:
+            run.record_node(node, seconds)
+        else:
+            registry.observe("fakenews_node_seconds", seconds, node=node)
+
+
+def record_page_load(url, tier, seconds, page_stats=None):
+    """페이지 로드 시간과 (있으면) 요청 수, 전송 바이트, 차단된 요청 수 등 페이지별 통계를 기록합니다."""
+    registry.observe("fakenews_page_load_seconds", seconds, tier=tier)
+    if page_stats:
+        registry.inc("fakenews_page_bytes_total", page_stats.get('bytes', 0), tier=tier)
+        registry.inc("fakenews_page_blocked_requests_total", page_stats.get('blocked', 0), tier=tier)
+    run = current_run()
+    if run is not None:
+        run.record_page_load(url, tier, seconds, page_stats)
+
+
+def record_gnews(query, seconds, results):
+    registry.observe("fakenews_gnews_query_seconds", seconds)
+    run = current_run()
+    if run is not None:
+        run.record_gnews(query, seconds, results)
+
+
+def record_llm(seconds, usage):
+    registry.observe("fakenews_llm_seconds", seconds)
+    registry.inc("fakenews_llm_calls_total")
+    for key in ('input_tokens', 'output_tokens'):
+        registry.inc("fakenews_llm_tokens_total", int(usage.get(key, 0) or 0), type=key.split('_')[0])
+    run = current_run()
+    if run is not None:
+        run.record_llm(seconds, usage)
+
+
+def record_cache(cache, hit):
+    registry.inc("fakenews_cache_requests_total", cache=cache, result='hit' if hit else 'miss')
+    run = current_run()
+    if run is not None:
+        run.record_cache(cache, hit)
+
+
+def record_prompt_compression(stage, report):
+    """프롬프트 압축 전후 추정 토큰 수를 기록합니다."""
+    registry.inc("fakenews_prompt_tokens_estimated_total", report['original_tokens'], stage=stage, kind='original')
+    registry.inc("fakenews_prompt_tokens_estimated_total", report['compressed_tokens'], stage=stage, kind='compressed')
+    run = current_run()
+    if run is not None:
+        run.record_prompt(stage, report)
+
+
+def record_prescreen(result):
+    """사전 선별 결과(잠정 판정으로 끝냈는지)를 기록합니다."""
+    registry.inc("fakenews_prescreen_total", outcome='routed' if result['routed'] else 'continued')
+    run = current_run()
+    if run is not None:
+        run.record_prescreen(result)
+
+
+def render_prometheus():
+    """프로세스 누적 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    return registry.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """/metrics 엔드포인트를 백그라운드 스레드로 띄웁니다 (프로세스당 한 번)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            print(f"...Prometheus 지표 엔드포인트: http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,170 @@
+"""LLM 파이프라인 전에 실행하는 저비용 사전 선별(pre-screen).
+
+도메인 평판과 제목/본문의 가벼운 어휘 특징(선정적 제목 패턴, 출처 표기 부족, 익명/전언 표현)만으로
+가짜일 확률을 로지스틱 점수로 추정합니다. 확신도(max(p, 1-p))가 PRESCREEN_CONFIDENCE 이상이면
+검색과 Gemini 호출 없이 잠정 판정을 내립니다.
+
+도메인 평판은 기본 표(통신사/주요 방송사), FAKENEWS_REPUTATION 파일, 그리고 지금까지의
+판정 이력(자주 거짓으로 판정된 도메인일수록 낮아짐)을 합쳐 계산합니다.
+"""
+import json
+import math
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+from cache import SQLiteTTLCache
+
+# --- 사전 선별 설정 ---
+PRESCREEN_ENABLED = os.environ.get("PRESCREEN_ENABLED", "0") == "1"
+# 이 확신도 이상이면 잠정 판정으로 바로 종료
+PRESCREEN_CONFIDENCE = float(os.environ.get("PRESCREEN_CONFIDENCE", "0.95"))
+# 판정 이력을 평판에 반영하기 시작하는 최소 판정 수
+PRESCREEN_MIN_HISTORY = int(os.environ.get("PRESCREEN_MIN_HISTORY", "5"))
+# 이 점수 이상으로 판정된 기사를 '거짓 판정'으로 집계 (app.py의 '높음' 기준과 동일)
+FLAGGED_SCORE = 0.75
+# 이 점수 미만으로 판정된 기사를 '사실 판정'으로 보고 교차 확인에 사용 (app.py의 '낮음' 기준과 동일)
+CORROBORATED_SCORE = 0.45
+DOMAIN_HISTORY_TTL = float(os.environ.get("DOMAIN_HISTORY_TTL", str(90 * 24 * 60 * 60)))
+DOMAIN_HISTORY_MAX_ENTRIES = int(os.environ.get("DOMAIN_HISTORY_MAX_ENTRIES", "20000"))
+
+# 기본 도메인 평판 (1.0=신뢰, -1.0=비신뢰). 포털(네이버/다음/네이트)은 여러 언론사를 싣기 때문에 넣지 않음
+DEFAULT_REPUTATION = {
+    'yna.co.kr': 1.0,
+    'yonhapnewstv.co.kr': 0.9,
+    'newsis.com': 0.8,
+    'news1.kr': 0.8,
+    'kbs.co.kr': 0.8,
+    'imbc.com': 0.8,
+    'sbs.co.kr': 0.8,
+    'ytn.co.kr': 0.8,
+}
+
+_SENSATIONAL = re.compile(
+    r'충격|경악|발칵|소름|헉|대박|결국|알고\s*보니|무조건|절대|반드시\s*봐야|공개\s*불가|믿을\s*수\s*없는|난리|폭로|실체'
+)
+_TITLE_PUNCT = re.compile(r'[!?]{1,}|\.{3,}|…')
+# 출처 표기: 인용 부호, '~에 따르면', 발언 동사, 기자 바이라인/이메일
+_ATTRIBUTION = re.compile(
+    r'[“”"]|따르면|밝혔다|말했다|전했다|설명했다|발표했다|덧붙였다|\w+\s*기자|[\w.+-]+@[\w-]+\.[\w.]+'
+)
+# 익명/전언 표현
+_HEDGING = re.compile(r'관계자|소식통|카더라|후문|알려졌다|전해졌다|의혹이\s*제기|것으로\s*보인다|라는\s*말이')
+
+# 특징 순서와 로지스틱 가중치 (양수면 가짜 쪽)
+FEATURES = ('reputation', 'sensational_title', 'title_punctuation', 'missing_attribution', 'hedging', 'corroboration')
+WEIGHTS = (-2.0, 1.5, 0.8, 1.5, 1.0, -2.5)
+BIAS = -0.3
+# 1,000자당 출처 표기가 이 정도면 출처 부족 특징이 0
+ATTRIBUTION_PER_1K = 4.0
+HEDGING_PER_1K = 3.0
+# 이 수 이상의 다른 언론사가 사실로 판정된 같은 주장을 보도했으면 교차 확인 특징이 1
+CORROBORATION_SOURCES = 3
+
+
+def domain_of(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _load_reputation_file():
+    path = os.environ.get("FAKENEWS_REPUTATION")
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return {domain.lower(): max(-1.0, min(1.0, float(score))) for domain, score in json.load(f).items()}
+
+
+class DomainReputation:
+    """기본 평판 표와 판정 이력을 합친 도메인 평판 (-1.0 ~ 1.0)."""
+
+    def __init__(self, table=None, ttl=DOMAIN_HISTORY_TTL, min_history=PRESCREEN_MIN_HISTORY,
+                 max_entries=DOMAIN_HISTORY_MAX_ENTRIES):
+        self.table = {**DEFAULT_REPUTATION, **_load_reputation_file(), **(table or {})}
+        self.min_history = min_history
+        self.history = SQLiteTTLCache('domain_history', ttl=ttl, max_entries=max_entries)
+        self._lock = threading.Lock()
+
+    def _table_score(self, domain):
+        # 하위 도메인(m.yna.co.kr 등)은 상위 도메인의 평판을 사용
+        parts = domain.split('.')
+        for idx in range(len(parts) - 1):
+            score = self.table.get('.'.join(parts[idx:]))
+            if score is not None:
+                return score
+        return None
+
+    def score(self, domain):
+        table_score = self._table_score(domain)
+        stats = self.history.get(domain) or {}
+        total = stats.get('total', 0)
+        if total < self.min_history:
+            return table_score or 0.0
+        # 라플라스 보정한 거짓 판정 비율을 -1.0(모두 거짓) ~ 1.0(모두 사실)으로 변환
+        history_score = 1.0 - 2.0 * (stats.get('flagged', 0) + 1) / (total + 2)
+        return history_score if table_score is None else (table_score + history_score) / 2
+
+    def record_verdict(self, domain, fake_probability):
+        if not domain:
+            return
+        with self._lock:
+            stats = self.history.get(domain) or {'total': 0, 'flagged': 0}
+            stats['total'] += 1
+            stats['flagged'] += int(fake_probability >= FLAGGED_SCORE)
+            self.history.set(domain, stats)
+
+
+domain_reputation = DomainReputation()
+
+
+def _density_gap(count, length, per_1k):
+    """1,000자당 count가 per_1k에 못 미치는 정도 (0.0~1.0)."""
+    if length <= 0:
+        return 1.0
+    return max(0.0, 1.0 - count * 1000.0 / length / per_1k)
+
+
+def extract_features(articles, reputation=domain_reputation):
+    """기사 목록의 특징 행렬(기사마다 FEATURES 순서의 값 리스트)을 만듭니다.
+
+    articles의 각 항목은 url, title, text와 선택적으로 corroboration(같은 주장을 사실로
+    보도한 다른 언론사 수)을 가진 dict입니다.
+    """
+    rows = []
+    for article in articles:
+        title, text = article.get('title', ''), article.get('text', '')
+        rows.append([
+            reputation.score(domain_of(article.get('url', ''))),
+            min(1.0, len(_SENSATIONAL.findall(title)) / 2),
+            min(1.0, len(_TITLE_PUNCT.findall(title)) / 2),
+            _density_gap(len(_ATTRIBUTION.findall(text)), len(text), ATTRIBUTION_PER_1K),
+            1.0 - _density_gap(len(_HEDGING.findall(text)), len(text), HEDGING_PER_1K),
+            min(1.0, article.get('corroboration', 0) / CORROBORATION_SOURCES),
+        ])
+    return rows
+
+
+def score_batch(articles, confidence=None, reputation=domain_reputation):
+    """기사 여러 건을 한 번에 점수화합니다. 입력 순서대로 결과 dict 목록을 반환합니다.
+
+    결과의 'routed'가 True이면 확신도가 기준 이상이라 잠정 판정으로 끝내도 되는 경우입니다.
+    """
+    confidence = PRESCREEN_CONFIDENCE if confidence is None else confidence
+    rows = extract_features(articles, reputation)
+    logits = [BIAS + sum(w * x for w, x in zip(WEIGHTS, row)) for row in rows]
+    results = []
+    for row, logit in zip(rows, logits):
+        probability = 1.0 / (1.0 + math.exp(-logit))
+        certainty = max(probability, 1.0 - probability)
+        results.append({
+            'fake_probability': probability,
+            'confidence': certainty,
+            'routed': certainty >= confidence,
+            'features': dict(zip(FEATURES, row)),
+        })
+    return results
+
+
+def score_article(url, title, text, corroboration=0, confidence=None):
+    return score_batch([{'url': url, 'title': title, 'text': text, 'corroboration': corroboration}], confidence)[0]
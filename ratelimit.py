@@ -0,0 +1,262 @@
+"""외부 백엔드(Gemini, GNews, Google News 디코더)별 공용 속도 제한기.
+
+- 토큰 버킷으로 초당 호출 수를 제한하고 (버스트 허용)
+- 재시도 가능한 오류(429/쿼터/일시적 장애)는 지터를 넣은 지수 백오프로 다시 시도하며
+- 오류가 잦아지면 동시 실행 한도를 절반으로 줄이고, 성공이 이어지면 조금씩 늘립니다(AIMD).
+
+백엔드별 설정은 RATE_LIMIT_<이름>_RPS / _BURST / _CONCURRENCY / _RETRIES 환경 변수로 조정합니다
+(RPS를 0으로 두면 초당 호출 수는 제한하지 않음).
+"""
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+
+from deadline import node_remaining
+from metrics import registry
+
+# 재시도 대기 시간 (초): base * 2^시도 + 지터, 최대 max
+RETRY_BASE_DELAY = float(os.environ.get("RATE_LIMIT_RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.environ.get("RATE_LIMIT_RETRY_MAX_DELAY", "30.0"))
+
+# 재시도할 HTTP 상태 코드와 예외 클래스 이름 (google.api_core, google.genai, requests 등을 임포트하지 않고 MRO의 이름으로 판별)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_ERROR_TYPES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError',
+    'BadGateway', 'GatewayTimeout', 'ServerError',
+    'Timeout', 'ConnectTimeout', 'ReadTimeout', 'ConnectionError', 'ChunkedEncodingError',
+}
+# 상태 코드는 단어 경계로만 매칭 ("Invalid value 5000" 같은 메시지를 재시도하지 않도록)
+_RETRYABLE_MESSAGE = re.compile(
+    r'\b(?:408|429|500|502|503|504)\b|resource[_ ]exhausted|rate[ -]?limit|too many requests'
+    r'|service unavailable|temporarily unavailable|timed out',
+    re.IGNORECASE,
+)
+
+
+class RetryableError(Exception):
+    """예외를 던지지 않는 라이브러리의 실패 응답을 재시도 대상으로 알리기 위한 예외."""
+
+
+def is_retryable_message(message):
+    """예외 없이 실패 메시지만 주는 응답(예: 디코더의 status=False)이 일시적 오류인지 판단합니다."""
+    return bool(_RETRYABLE_MESSAGE.search(message))
+
+
+def _status_code(error):
+    for candidate in (getattr(error, 'status_code', None), getattr(error, 'code', None),
+                      getattr(getattr(error, 'response', None), 'status_code', None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_retryable(error):
+    """예외 타입과 HTTP 상태 코드로 재시도 여부를 판단합니다."""
+    if isinstance(error, (RetryableError, TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in _RETRYABLE_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    # 상태 코드 없이 감싼 예외(예: LangChain 래퍼)는 원인 예외를 확인
+    cause = error.__cause__ or error.__context__
+    return cause is not None and cause is not error and is_retryable(cause)
+
+
+class BackendLimiter:
+    """백엔드 하나의 토큰 버킷 + 적응형 동시 실행 한도 + 재시도 정책."""
+
+    def __init__(self, name, rate, burst, max_concurrency, max_retries):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self.counters = {'calls': 0, 'succeeded': 0, 'retries': 0, 'failed': 0, 'throttled_seconds': 0.0}
+
+    # --- 토큰 버킷 ---
+    def _reserve_token(self):
+        """토큰 하나를 예약하고 기다려야 할 시간(초)을 반환합니다."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # 토큰이 음수가 되면 먼저 예약한 호출부터 차례로 대기
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.counters['throttled_seconds'] += wait
+        if wait:
+            registry.inc("fakenews_ratelimit_wait_seconds_total", wait, backend=self.name)
+        return wait
+
+    def wait_for_token(self):
+        wait = self._reserve_token()
+        if wait:
+            time.sleep(wait)
+
+    async def await_token(self):
+        wait = self._reserve_token()
+        if wait:
+            await asyncio.sleep(wait)
+
+    # --- 적응형 동시 실행 한도 ---
+    def _try_enter(self):
+        if self._in_flight < max(1, int(self._limit)):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _enter(self):
+        with self._slot_freed:
+            while not self._try_enter():
+                self._slot_freed.wait()
+
+    async def _aenter(self):
+        while True:
+            with self._lock:
+                if self._try_enter():
+                    return
+            await asyncio.sleep(0.05)
+
+    def _exit(self, outcome):
+        with self._slot_freed:
+            self._in_flight -= 1
+            if outcome == 'throttled':
+                self._limit = max(1.0, self._limit / 2)
+            elif outcome == 'succeeded':
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._slot_freed.notify_all()
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+        registry.inc("fakenews_ratelimit_calls_total", backend=self.name, outcome=key)
+
+    def _backoff(self, attempt):
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _handle_error(self, error, attempt):
+        """재시도할 대기 시간을 반환하거나, 재시도하지 않을 오류면 다시 던집니다."""
+        delay = self._backoff(attempt)
+        remaining = node_remaining()
+        # 실행 마감 시간(deadline.py)이 있으면 그 안에 끝나지 않을 재시도는 하지 않음
+        if not is_retryable(error) or attempt >= self.max_retries or (remaining is not None and delay >= remaining):
+            self._count('failed')
+            raise error
+        self._count('retries')
+        print(f"...[{self.name}] 일시적 오류로 {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {error.__class__.__name__}")
+        return delay
+
+    def call(self, func, *args, acquire_token=True, **kwargs):
+        """func를 속도 제한/재시도 정책에 따라 실행합니다 (블로킹)."""
+        self._count('calls')
+        attempt = 0
+        while True:
+            if acquire_token:
+                self.wait_for_token()
+            self._enter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._exit('throttled' if is_retryable(e) else 'failed')
+                time.sleep(self._handle_error(e, attempt))
+                attempt += 1
+                continue
+            self._exit('succeeded')
+            self._count('succeeded')
+            return result
+
+    async def acall(self, afunc, *args, acquire_token=True, **kwargs):
+        self._count('calls')
+        attempt = 0
+        while True:
+            if acquire_token:
+                await self.await_token()
+            await self._aenter()
+            try:
+                result = await afunc(*args, **kwargs)
+            except Exception as e:
+                self._exit('throttled' if is_retryable(e) else 'failed')
+                await asyncio.sleep(self._handle_error(e, attempt))
+                attempt += 1
+                continue
+            self._exit('succeeded')
+            self._count('succeeded')
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                'rate': self.rate,
+                'burst': self.burst,
+                'concurrency_limit': max(1, int(self._limit)),
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+            }
+
+
+def _from_env(name, rate, burst, concurrency, retries):
+    prefix = f"RATE_LIMIT_{name.upper()}_"
+    return BackendLimiter(
+        name,
+        rate=float(os.environ.get(prefix + "RPS", str(rate))),
+        burst=float(os.environ.get(prefix + "BURST", str(burst))),
+        max_concurrency=int(os.environ.get(prefix + "CONCURRENCY", str(concurrency))),
+        max_retries=int(os.environ.get(prefix + "RETRIES", str(retries))),
+    )
+
+
+# --- 백엔드별 기본 설정 (RPS, 버스트, 최대 동시 실행, 재시도 횟수) ---
+gemini_limiter = _from_env('gemini', rate=5.0, burst=10, concurrency=8, retries=4)
+gnews_limiter = _from_env('gnews', rate=1.0, burst=2, concurrency=2, retries=3)
+decoder_limiter = _from_env('decoder', rate=1.0, burst=3, concurrency=3, retries=3)
+
+LIMITERS = {limiter.name: limiter for limiter in (gemini_limiter, gnews_limiter, decoder_limiter)}
+
+
+def get_rate_limit_stats():
+    """백엔드별 호출/재시도/실패 횟수, 대기 시간, 현재 동시 실행 한도를 반환합니다."""
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
+
+
+def langchain_rate_limiter(limiter):
+    """LangChain 채팅 모델의 rate_limiter로 쓸 어댑터 (LLM 캐시에 없을 때만 토큰을 소비)."""
+    from langchain_core.rate_limiters import BaseRateLimiter
+
+    class _TokenBucketRateLimiter(BaseRateLimiter):
+        def acquire(self, *, blocking=True):
+            limiter.wait_for_token()
+            return True
+
+        async def aacquire(self, *, blocking=True):
+            await limiter.await_token()
+            return True
+
+    return _TokenBucketRateLimiter()
+
+
+def rate_limited_runnable(runnable, limiter):
+    """runnable 호출에 재시도/적응형 동시 실행 한도를 적용합니다 (토큰은 rate_limiter가 소비)."""
+    from langchain_core.runnables import RunnableLambda
+
+    def invoke(input, config):
+        return limiter.call(runnable.invoke, input, config, acquire_token=False)
+
+    async def ainvoke(input, config):
+        return await limiter.acall(runnable.ainvoke, input, config, acquire_token=False)
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"{limiter.name}_rate_limited")
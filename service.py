@@ -0,0 +1,336 @@
+"""팩트체크 HTTP JSON 서비스.
+
+같은 기사(정규화 URL)에 대한 요청이 동시에 몰리면 실행 중이거나 대기 중인 작업 하나로
+합치고(coalescing), 대기열이 가득 차면 429로 거절합니다. 작업은 비동기로 제출한 뒤
+작업 ID로 진행 상황(끝난 노드, 검색 출처)과 결과를 조회합니다.
+
+엔드포인트:
+    POST /v1/jobs        {"url": ..., "force_refresh": false} → 202 작업 정보 (대기열 포화 시 429)
+    GET  /v1/jobs/<id>   작업 상태/진행 상황/결과
+    POST /v1/check       제출 후 완료까지 기다려 결과 반환 (timeout 초과 시 202 작업 정보)
+    GET  /healthz        대기열/워커 상태
+    GET  /metrics        Prometheus 지표
+
+사용 예:
+    python service.py --port 8800 --workers 4 --queue-size 32
+    FAKENEWS_API_URL=http://127.0.0.1:8800 streamlit run app.py
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from agent import canonicalize_url, deserialize_state, serialize_state, stream_graph
+from metrics import registry, render_prometheus
+from ratelimit import get_rate_limit_stats
+
+# --- 서비스 설정 ---
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", "8800"))
+SERVICE_WORKERS = int(os.environ.get("SERVICE_WORKERS", "4"))
+SERVICE_QUEUE_SIZE = int(os.environ.get("SERVICE_QUEUE_SIZE", "32"))
+# 끝난 작업을 조회용으로 보관하는 시간(초)
+SERVICE_JOB_TTL = float(os.environ.get("SERVICE_JOB_TTL", "600"))
+SERVICE_SYNC_TIMEOUT = float(os.environ.get("SERVICE_SYNC_TIMEOUT", "180"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, url, key, force_refresh):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.key = key
+        self.force_refresh = force_refresh
+        self.status = 'queued'
+        self.requests = 1
+        self.nodes = []
+        self.sources = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'url': self.url,
+            'status': self.status,
+            'coalesced_requests': self.requests,
+            'nodes': list(self.nodes),
+            'sources': list(self.sources),
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobManager:
+    """고정 크기 대기열과 워커 스레드로 팩트체크 작업을 실행합니다."""
+
+    def __init__(self, workers=SERVICE_WORKERS, queue_size=SERVICE_QUEUE_SIZE, job_ttl=SERVICE_JOB_TTL):
+        self.workers = max(1, workers)
+        self.job_ttl = job_ttl
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._in_flight = {}
+        self._running = 0
+        for idx in range(self.workers):
+            threading.Thread(target=self._worker, name=f"factcheck-worker-{idx}", daemon=True).start()
+
+    def submit(self, url, force_refresh=False):
+        """(작업, 합쳐졌는지 여부)를 반환합니다. 대기열이 가득 차면 QueueFull."""
+        key = canonicalize_url(url)
+        with self._lock:
+            self._purge_expired()
+            job = self._in_flight.get(key)
+            # 다시 검사 요청은 캐시를 무시하는 작업에만 합침. 캐시를 쓰며 이미 실행 중인 작업이면
+            # 캐시된 판정을 돌려줄 수 있으므로 새 작업을 만듦
+            if job is not None and (not force_refresh or job.force_refresh or job.status == 'queued'):
+                job.requests += 1
+                if force_refresh:
+                    job.force_refresh = True
+                registry.inc("fakenews_service_requests_total", outcome='coalesced')
+                return job, True
+
+            job = Job(url, key, force_refresh)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                registry.inc("fakenews_service_requests_total", outcome='rejected')
+                raise QueueFull()
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        registry.inc("fakenews_service_requests_total", outcome='accepted')
+        return job, False
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'in_flight': len(self._in_flight),
+                'jobs': len(self._jobs),
+            }
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.job_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                job.status = 'running'
+                job.started_at = time.time()
+                self._running += 1
+            try:
+                for event, payload in stream_graph(job.url, force_refresh=job.force_refresh):
+                    if event == 'node':
+                        job.nodes.append(payload[0])
+                    elif event == 'source':
+                        # 응답 직렬화 중 키가 늘지 않도록 excluded도 미리 넣어 둠
+                        job.sources.append({**payload, 'excluded': False})
+                    elif event == 'source_summary':
+                        # 요약이 도착하면 이미 내보낸 출처 항목을 갱신 (None이면 근거에서 제외됨)
+                        for source in job.sources:
+                            if source['source_url'] == payload['source_url']:
+                                source['summary'] = payload['summary']
+                                source['excluded'] = payload['summary'] is None
+                    elif event == 'final':
+                        job.result = serialize_state(payload)
+                job.status = 'done'
+            except Exception as e:
+                print(f"...작업 {job.id} 실행 중 에러 발생: {e}")
+                job.error = f"{e.__class__.__name__}: {e}"
+                job.status = 'error'
+            finally:
+                with self._lock:
+                    job.finished_at = time.time()
+                    self._running -= 1
+                    # 끝난 뒤 들어온 같은 URL 요청은 새 작업(대부분 판정 캐시 적중)으로 처리
+                    if self._in_flight.get(job.key) is job:
+                        del self._in_flight[job.key]
+                job.done.set()
+                self._queue.task_done()
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    manager = None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _submit(self):
+        try:
+            data = self._read_json()
+        except ValueError:
+            self._send_json(400, {'error': "요청 본문이 올바른 JSON이 아닙니다."})
+            return None
+        url = str(data.get('url', '')).strip()
+        if not (url.startswith("http://") or url.startswith("https://")):
+            self._send_json(400, {'error': "'url'은 http:// 또는 https://로 시작해야 합니다."})
+            return None
+        # 작업을 큐에 넣기 전에 검증 (잘못된 값으로 작업만 남고 500이 나지 않도록)
+        try:
+            timeout = float(data.get('timeout', SERVICE_SYNC_TIMEOUT))
+        except (TypeError, ValueError):
+            timeout = None
+        if timeout is None or not 0 <= timeout < float('inf'):
+            self._send_json(400, {'error': "'timeout'은 0 이상의 숫자(초)여야 합니다."})
+            return None
+        try:
+            job, coalesced = self.manager.submit(url, bool(data.get('force_refresh')))
+        except QueueFull:
+            self._send_json(429, {'error': "대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도하세요."}, {'Retry-After': '5'})
+            return None
+        return job, coalesced, timeout
+
+    def do_POST(self):
+        path = self.path.rstrip('/')
+        if path not in ('/v1/jobs', '/v1/check'):
+            self._send_json(404, {'error': "not found"})
+            return
+        submitted = self._submit()
+        if submitted is None:
+            return
+        job, coalesced, timeout = submitted
+        if path == '/v1/check':
+            job.done.wait(timeout)
+        status = 200 if job.done.is_set() else 202
+        self._send_json(status, {**job.to_dict(), 'coalesced': coalesced}, {'Location': f"/v1/jobs/{job.id}"})
+
+    def do_GET(self):
+        path = self.path.rstrip('/')
+        if path == '/metrics':
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == '/healthz':
+            self._send_json(200, {'status': 'ok', **self.manager.stats(), 'rate_limits': get_rate_limit_stats()})
+        elif path.startswith('/v1/jobs/'):
+            job = self.manager.get(path.rsplit('/', 1)[-1])
+            if job is None:
+                self._send_json(404, {'error': "작업을 찾을 수 없습니다 (만료되었을 수 있음)."})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {'error': "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, queue_size=SERVICE_QUEUE_SIZE):
+    handler = type('ServiceHandler', (_ServiceHandler,), {'manager': JobManager(workers, queue_size)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class ServiceClient:
+    """app.py 등에서 팩트체크 서비스를 호출하는 클라이언트."""
+
+    def __init__(self, base_url, poll_interval=1.0, timeout=600):
+        self.base_url = base_url.rstrip('/')
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def submit(self, url, force_refresh=False):
+        resp = self.session.post(f"{self.base_url}/v1/jobs", json={'url': url, 'force_refresh': force_refresh}, timeout=10)
+        if resp.status_code == 429:
+            raise RuntimeError("팩트체크 서비스가 혼잡합니다. 잠시 후 다시 시도하세요.")
+        resp.raise_for_status()
+        return resp.json()
+
+    def job(self, job_id):
+        resp = self.session.get(f"{self.base_url}/v1/jobs/{job_id}", timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+
+    def stream(self, url, force_refresh=False):
+        """stream_graph와 같은 (이벤트, 데이터) 튜플을 폴링으로 만들어 냅니다.
+
+        노드 이벤트의 갱신 상태는 제공되지 않으므로 빈 dict로 전달합니다.
+        """
+        job = self.submit(url, force_refresh)
+        deadline = time.monotonic() + self.timeout
+        seen_nodes, seen_sources, seen_summaries = 0, 0, set()
+        while True:
+            for node_name in job['nodes'][seen_nodes:]:
+                yield 'node', (node_name, {})
+            for article in job['sources'][seen_sources:]:
+                yield 'source', {**article, 'summary': None}
+            seen_nodes, seen_sources = len(job['nodes']), len(job['sources'])
+            # 출처 항목은 요약이 도착하면 서버에서 갱신되므로 처음 채워진 요약만 한 번씩 내보냄
+            for article in job['sources']:
+                if article['source_url'] not in seen_summaries and (article.get('summary') or article.get('excluded')):
+                    seen_summaries.add(article['source_url'])
+                    yield 'source_summary', {'source_url': article['source_url'], 'summary': article.get('summary')}
+
+            if job['status'] == 'done':
+                yield 'final', deserialize_state(job['result'])
+                return
+            if job['status'] == 'error':
+                raise RuntimeError(f"팩트체크 서비스 작업 실패: {job['error']}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"팩트체크 서비스 응답 시간 초과 ({self.timeout}s)")
+            time.sleep(self.poll_interval)
+            job = self.job(job['job_id'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="팩트체크 HTTP JSON 서비스")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="동시에 실행할 팩트체크 수")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE, help="대기열 크기 (초과 시 429)")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.workers, args.queue_size)
+    print(f"...팩트체크 서비스 실행: http://{args.host}:{args.port} (워커 {args.workers}, 대기열 {args.queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()